@@ -1,8 +1,7 @@
 from django.contrib import admin
-from .models import User , Profile , OneTimePassword ,PasswordResetOTP
+from .models import User , Profile , OneTimePassword
 # Register your models here.
 
 admin.site.register(User)
 admin.site.register(OneTimePassword)
 admin.site.register(Profile)
-admin.site.register(PasswordResetOTP)
\ No newline at end of file
@@ -0,0 +1,115 @@
+"""Outbound email queue.
+
+Messages are handed to a background thread that sends them in batches over
+one reused connection of the configured EMAIL_BACKEND, so requests never wait
+on the mail server. Failed messages are retried with exponential backoff.
+With EMAIL_QUEUE_ASYNC = False (e.g. in tests) messages are sent inline.
+"""
+import atexit
+import logging
+import queue
+import threading
+import time
+from django.conf import settings
+from django.core.mail import get_connection
+
+logger = logging.getLogger(__name__)
+
+
+class EmailQueue:
+    def __init__(self, batch_size=50, max_retries=3, backoff=1.0, idle_timeout=30.0):
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.idle_timeout = idle_timeout
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def enqueue(self, message):
+        """Queue an EmailMessage for the sender thread, starting it if needed."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='email-queue', daemon=True)
+                self._thread.start()
+        self._queue.put(message)
+
+    def flush(self):
+        """Block until every queued message has been sent or given up on."""
+        self._queue.join()
+
+    def _run(self):
+        connection = None
+        while True:
+            try:
+                batch = [self._queue.get(timeout=self.idle_timeout)]
+            except queue.Empty:
+                # Nothing to send for a while: don't hold the SMTP session open
+                connection = self._close(connection)
+                continue
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            for message in batch:
+                try:
+                    connection = self._send(message, connection)
+                finally:
+                    self._queue.task_done()
+
+    def _send(self, message, connection):
+        """Send one message over `connection`, reconnecting and backing off on failure.
+
+        Returns the connection to reuse for the next message.
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                if connection is None:
+                    connection = get_connection(fail_silently=False)
+                    connection.open()
+                connection.send_messages([message])
+                return connection
+            except Exception:
+                connection = self._close(connection)
+                if attempt == self.max_retries:
+                    logger.exception("Giving up on email %r to %s", message.subject, message.to)
+                    return None
+                logger.warning("Sending email to %s failed, retrying", message.to, exc_info=True)
+                time.sleep(self.backoff * 2 ** attempt)
+
+    @staticmethod
+    def _close(connection):
+        if connection is not None:
+            try:
+                connection.close()
+            except Exception:
+                logger.warning("Closing the email connection failed", exc_info=True)
+        return None
+
+
+_email_queue = None
+_email_queue_lock = threading.Lock()
+
+
+def get_email_queue():
+    global _email_queue
+    if _email_queue is None:
+        with _email_queue_lock:
+            if _email_queue is None:
+                _email_queue = EmailQueue(
+                    batch_size=getattr(settings, 'EMAIL_QUEUE_BATCH_SIZE', 50),
+                    max_retries=getattr(settings, 'EMAIL_QUEUE_MAX_RETRIES', 3),
+                )
+                # Give queued mail a chance to go out on a clean shutdown
+                atexit.register(_email_queue.flush)
+    return _email_queue
+
+
+def send_email(message):
+    """Send `message` through the queue, or inline when EMAIL_QUEUE_ASYNC is off."""
+    if getattr(settings, 'EMAIL_QUEUE_ASYNC', True):
+        get_email_queue().enqueue(message)
+    else:
+        message.send(fail_silently=False)
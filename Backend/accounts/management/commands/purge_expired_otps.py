@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from accounts.models import OneTimePassword
+
+
+class Command(BaseCommand):
+    help = 'Delete expired email verification and password reset codes'
+
+    def handle(self, *args, **options):
+        deleted, _ = OneTimePassword.objects.filter(expires_at__lte=timezone.now()).delete()
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} expired codes'))
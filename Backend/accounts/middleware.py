@@ -1,17 +1,55 @@
-import pytz
+from collections import namedtuple
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from functools import lru_cache
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
+
+UTC = ZoneInfo("UTC")
+
+# A local calendar day and its [start, end) bounds in UTC
+LocalDay = namedtuple('LocalDay', ['date', 'start', 'end'])
+
+
+@lru_cache(maxsize=512)
+def resolve_timezone(tzname):
+    """ZoneInfo for a User-Timezone header value, UTC when it is unknown or malformed.
+
+    Header values repeat across requests, so resolved zones are memoized;
+    the LRU bound keeps arbitrary client input from growing the cache.
+    """
+    try:
+        return ZoneInfo(tzname)
+    except (ZoneInfoNotFoundError, ValueError):
+        return UTC
+
+
+def make_local(user_timezone, naive):
+    """Aware datetime of the wall-clock time `naive` in `user_timezone` (pytz or zoneinfo)."""
+    if hasattr(user_timezone, 'localize'):
+        return user_timezone.localize(naive)
+    return naive.replace(tzinfo=user_timezone)
+
+
+def local_day_bounds(user_timezone, day):
+    """LocalDay for `day` in `user_timezone`, with UTC bounds (DST-safe)."""
+    def midnight(value):
+        return make_local(user_timezone, datetime.combine(value, time.min)).astimezone(dt_timezone.utc)
+
+    return LocalDay(day, midnight(day), midnight(day + timedelta(days=1)))
+
 
 class TimezoneMiddleware:
     def __init__(self, get_response):
         self.get_response = get_response
 
     def __call__(self, request):
-        tzname = request.headers.get("User-Timezone", "UTC")
-        try:
-            user_timezone = pytz.timezone(tzname)
-        except pytz.UnknownTimeZoneError:
-            user_timezone = pytz.UTC
-        
+        user_timezone = resolve_timezone(request.headers.get("User-Timezone", "UTC"))
+
         request.user_timezone = user_timezone
+        # Today in the user's timezone, only computed if a view asks for it
+        request.local_day = SimpleLazyObject(
+            lambda: local_day_bounds(user_timezone, timezone.now().astimezone(user_timezone).date())
+        )
         response = self.get_response(request)
-        return response 
\ No newline at end of file
+        return response
@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    """Replace the plain-text OneTimePassword/PasswordResetOTP tables with one hashed, expiring store.
+
+    Outstanding codes are dropped; users can simply request a new one.
+    """
+
+    dependencies = [
+        ('accounts', '0006_remove_passwordresetotp_created_at_and_more'),
+    ]
+
+    operations = [
+        migrations.DeleteModel(
+            name='PasswordResetOTP',
+        ),
+        migrations.DeleteModel(
+            name='OneTimePassword',
+        ),
+        migrations.CreateModel(
+            name='OneTimePassword',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('purpose', models.CharField(choices=[('verify_email', 'Verify email'), ('password_reset', 'Password reset')], max_length=20)),
+                ('code_hash', models.CharField(max_length=64)),
+                ('expires_at', models.DateTimeField()),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='otps', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['expires_at'], name='otp_expires_at_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'purpose'), name='otp_unique_user_purpose')],
+            },
+        ),
+    ]
@@ -7,7 +7,12 @@ from rest_framework_simplejwt.tokens import RefreshToken
 from django.db.models.signals import post_save
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db.models import F
+from django.utils import timezone
+from datetime import timedelta
 from decimal import Decimal
+import hashlib
+import hmac
 import os
 # Create your models here.
 
@@ -47,13 +52,71 @@ class User(AbstractBaseUser,PermissionsMixin):
     
 User = get_user_model()
 class OneTimePassword(models.Model):
-    user = models.OneToOneField(User, on_delete=models.CASCADE)
-    code = models.CharField(max_length=6)
+    """Short-lived code sent by email, at most one per (user, purpose).
+
+    Only an HMAC of the code is stored. Codes expire after OTP_EXPIRY_MINUTES
+    and are dropped after OTP_MAX_ATTEMPTS wrong guesses; expired rows are
+    removed by the purge_expired_otps command.
+    """
+    VERIFY_EMAIL = 'verify_email'
+    PASSWORD_RESET = 'password_reset'
+    PURPOSE_CHOICES = ((VERIFY_EMAIL, 'Verify email'), (PASSWORD_RESET, 'Password reset'))
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='otps')
+    purpose = models.CharField(max_length=20, choices=PURPOSE_CHOICES)
+    code_hash = models.CharField(max_length=64)
+    expires_at = models.DateTimeField()
+    attempts = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'purpose'], name='otp_unique_user_purpose'),
+        ]
+        indexes = [
+            models.Index(fields=['expires_at'], name='otp_expires_at_idx'),
+        ]
 
     def __str__(self):
-        return f"{self.user.first_name}-passcode"
-    
-
+        return f"{self.user.first_name}-{self.purpose}-passcode"
+
+    @staticmethod
+    def hash_code(user, purpose, code):
+        message = f"{user.pk}:{purpose}:{code}".encode()
+        return hmac.new(settings.SECRET_KEY.encode(), message, hashlib.sha256).hexdigest()
+
+    @classmethod
+    def issue(cls, user, purpose, code):
+        """Store `code` as the user's current code for `purpose`, replacing any earlier one."""
+        cls.objects.update_or_create(
+            user=user,
+            purpose=purpose,
+            defaults={
+                'code_hash': cls.hash_code(user, purpose, code),
+                'expires_at': timezone.now() + timedelta(minutes=settings.OTP_EXPIRY_MINUTES),
+                'attempts': 0,
+            },
+        )
+
+    @classmethod
+    def verify(cls, user, purpose, code):
+        """Check and consume the user's code for `purpose`. Returns True when it matches.
+
+        Every step is a single conditional UPDATE or DELETE, so concurrent
+        guesses can neither exceed OTP_MAX_ATTEMPTS nor consume a code twice.
+        """
+        otp = cls.objects.filter(user=user, purpose=purpose, expires_at__gt=timezone.now()).first()
+        if otp is None:
+            return False
+        if hmac.compare_digest(otp.code_hash, cls.hash_code(user, purpose, code)):
+            deleted, _ = cls.objects.filter(pk=otp.pk, code_hash=otp.code_hash).delete()
+            return deleted > 0
+        counted = cls.objects.filter(
+            pk=otp.pk, attempts__lt=settings.OTP_MAX_ATTEMPTS - 1
+        ).update(attempts=F('attempts') + 1)
+        if not counted:
+            # This was the last allowed guess
+            cls.objects.filter(pk=otp.pk, attempts__gte=settings.OTP_MAX_ATTEMPTS - 1).delete()
+        return False
 
 
 
@@ -95,9 +158,31 @@ class Profile(models.Model):
     diabetes_type = models.CharField(max_length=22, choices=SUGAR_TYPE_CHOICES, blank=True, null=True)
     age = models.PositiveIntegerField(null=True, blank=True)
 
+    # Fields the calorie goals are computed from (see diet.models.CalorieGoals)
+    GOAL_FIELDS = ('weight', 'height', 'age', 'gender')
+
     def __str__(self):
         return self.user.email if self.user else "Unknown User"
-    
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._saved_goal_values = instance._goal_values()
+        return instance
+
+    def _goal_values(self):
+        return tuple(self.__dict__.get(field) for field in self.GOAL_FIELDS)
+
+    @property
+    def goal_fields_changed(self):
+        """Whether a GOAL_FIELDS value differs from what was loaded or last saved."""
+        return self._goal_values() != getattr(self, '_saved_goal_values', None)
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # post_save receivers have seen the old values; track from here on
+        self._saved_goal_values = self._goal_values()
+
     def delete(self, *args, **kwargs):
         if self.image and self.image.name != 'default.jpeg':
             try:
@@ -109,21 +194,6 @@ class Profile(models.Model):
 
 @receiver(post_save, sender=settings.AUTH_USER_MODEL)
 def create_user_profile(sender, instance, created, **kwargs):
+    # Only on registration: saving the user (e.g. on login) must not rewrite the profile
     if created:
         Profile.objects.create(user=instance)
-
-@receiver(post_save, sender=settings.AUTH_USER_MODEL)
-def save_user_profile(sender, instance, **kwargs):
-    if hasattr(instance, 'profile'):
-        instance.profile.save()
-    else:
-        Profile.objects.create(user=instance)
-
-
-
-class PasswordResetOTP(models.Model):
-    user = models.ForeignKey(User, on_delete=models.CASCADE)
-    code = models.CharField(max_length=6)
-
-    def __str__(self):
-        return f"{self.user.first_name}-passcode"
\ No newline at end of file
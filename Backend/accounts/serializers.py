@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import User , Profile , PasswordResetOTP
+from .models import User , Profile
 from django.contrib.auth import authenticate
 from rest_framework.exceptions import AuthenticationFailed
 from django.contrib.auth.tokens import PasswordResetTokenGenerator
@@ -35,6 +35,7 @@ class UserRegisterSerializer(serializers.ModelSerializer):
     
 
 class VerifyOTPSerializer(serializers.Serializer):
+    email = serializers.EmailField()
     otp = serializers.CharField(max_length=6, required=True)
 
 
@@ -78,6 +79,7 @@ class SendResetOTPSerializer(serializers.Serializer):
         return email
 
 class ConfirmResetOTPSerializer(serializers.Serializer):
+    email = serializers.EmailField()
     otp = serializers.CharField(max_length=6)
 
 class ResetPasswordSerializer(serializers.Serializer):
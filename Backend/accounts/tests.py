@@ -1,3 +1,194 @@
-from django.test import TestCase
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from io import StringIO
 
-# Create your tests here.
+from django.core import mail
+from django.core.mail import EmailMessage
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from .email_queue import EmailQueue
+from .middleware import UTC, local_day_bounds, resolve_timezone
+from .models import OneTimePassword, Profile, User
+from .views import LoginUserView, RegisterUserView, VerifyUserEmail
+from diet.models import CalorieGoals
+from rest_framework.test import APIRequestFactory
+
+
+class TimezoneResolverTest(SimpleTestCase):
+    def test_unknown_and_malformed_names_fall_back_to_utc(self):
+        for name in ('Mars/Olympus', '../../etc/passwd', ''):
+            self.assertIs(resolve_timezone(name), UTC)
+
+    def test_resolved_zones_are_memoized(self):
+        self.assertIs(resolve_timezone('Africa/Cairo'), resolve_timezone('Africa/Cairo'))
+
+    def test_local_day_bounds_across_dst_change(self):
+        local_day = local_day_bounds(resolve_timezone('America/New_York'), date(2026, 11, 1))
+        self.assertEqual(local_day.start, datetime(2026, 11, 1, 4, tzinfo=dt_timezone.utc))
+        # The day clocks fall back lasts 25 hours
+        self.assertEqual(local_day.end, datetime(2026, 11, 2, 5, tzinfo=dt_timezone.utc))
+
+
+class FlakyEmailBackend(EmailBackend):
+    """locmem backend whose first `failures` sends raise, like a flaky SMTP server."""
+    failures = 0
+    opened = 0
+
+    def open(self):
+        FlakyEmailBackend.opened += 1
+        return super().open()
+
+    def send_messages(self, messages):
+        if FlakyEmailBackend.failures:
+            FlakyEmailBackend.failures -= 1
+            raise ConnectionError('mail server unavailable')
+        return super().send_messages(messages)
+
+
+@override_settings(EMAIL_BACKEND='accounts.tests.FlakyEmailBackend')
+class EmailQueueTest(SimpleTestCase):
+    def setUp(self):
+        FlakyEmailBackend.failures = 0
+        FlakyEmailBackend.opened = 0
+        self.queue = EmailQueue(batch_size=10, max_retries=2, backoff=0)
+
+    def message(self, number):
+        return EmailMessage(f'OTP {number}', 'body', 'from@example.com', [f'user{number}@example.com'])
+
+    def test_batch_is_sent_over_one_connection(self):
+        for number in range(5):
+            self.queue.enqueue(self.message(number))
+        self.queue.flush()
+        self.assertEqual([message.subject for message in mail.outbox], [f'OTP {number}' for number in range(5)])
+        self.assertEqual(FlakyEmailBackend.opened, 1)
+
+    def test_failed_send_is_retried_on_a_new_connection(self):
+        FlakyEmailBackend.failures = 2
+        self.queue.enqueue(self.message(1))
+        self.queue.flush()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(FlakyEmailBackend.opened, 3)
+
+    def test_message_is_dropped_after_max_retries(self):
+        FlakyEmailBackend.failures = 3
+        self.queue.enqueue(self.message(1))
+        self.queue.enqueue(self.message(2))
+        self.queue.flush()
+        self.assertEqual([message.subject for message in mail.outbox], ['OTP 2'])
+
+
+@override_settings(OTP_EXPIRY_MINUTES=10, OTP_MAX_ATTEMPTS=3)
+class OneTimePasswordTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='otp@example.com', password='pass1234', first_name='O', last_name='T'
+        )
+
+    def test_code_is_hashed_and_consumed(self):
+        OneTimePassword.issue(self.user, OneTimePassword.VERIFY_EMAIL, '123456')
+        self.assertNotEqual(OneTimePassword.objects.get(user=self.user).code_hash, '123456')
+        self.assertFalse(OneTimePassword.verify(self.user, OneTimePassword.PASSWORD_RESET, '123456'))
+        self.assertTrue(OneTimePassword.verify(self.user, OneTimePassword.VERIFY_EMAIL, '123456'))
+        self.assertFalse(OneTimePassword.verify(self.user, OneTimePassword.VERIFY_EMAIL, '123456'))
+
+    def test_reissuing_replaces_the_previous_code(self):
+        OneTimePassword.issue(self.user, OneTimePassword.PASSWORD_RESET, '111111')
+        OneTimePassword.issue(self.user, OneTimePassword.PASSWORD_RESET, '222222')
+        self.assertEqual(OneTimePassword.objects.filter(user=self.user).count(), 1)
+        self.assertFalse(OneTimePassword.verify(self.user, OneTimePassword.PASSWORD_RESET, '111111'))
+        self.assertTrue(OneTimePassword.verify(self.user, OneTimePassword.PASSWORD_RESET, '222222'))
+
+    def test_code_is_dropped_after_too_many_wrong_guesses(self):
+        OneTimePassword.issue(self.user, OneTimePassword.VERIFY_EMAIL, '123456')
+        for guess in ('000000', '000001', '000002'):
+            self.assertFalse(OneTimePassword.verify(self.user, OneTimePassword.VERIFY_EMAIL, guess))
+        self.assertFalse(OneTimePassword.verify(self.user, OneTimePassword.VERIFY_EMAIL, '123456'))
+
+    def test_expired_codes_are_rejected_and_purged(self):
+        OneTimePassword.issue(self.user, OneTimePassword.VERIFY_EMAIL, '123456')
+        OneTimePassword.issue(self.user, OneTimePassword.PASSWORD_RESET, '654321')
+        OneTimePassword.objects.filter(purpose=OneTimePassword.VERIFY_EMAIL).update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+        self.assertFalse(OneTimePassword.verify(self.user, OneTimePassword.VERIFY_EMAIL, '123456'))
+
+        call_command('purge_expired_otps', stdout=StringIO())
+        self.assertEqual(
+            list(OneTimePassword.objects.values_list('purpose', flat=True)), [OneTimePassword.PASSWORD_RESET]
+        )
+
+    def verify_email(self, code):
+        request = APIRequestFactory().post('/verify-email/', {'email': self.user.email, 'otp': code}, format='json')
+        return VerifyUserEmail.as_view()(request)
+
+    def test_verifying_email_consumes_the_code(self):
+        OneTimePassword.issue(self.user, OneTimePassword.VERIFY_EMAIL, '123456')
+        response = self.verify_email('123456')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('access_token', response.data)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.is_verified)
+        self.assertFalse(OneTimePassword.objects.filter(user=self.user).exists())
+
+    def test_already_verified_user_keeps_the_code(self):
+        User.objects.filter(pk=self.user.pk).update(is_verified=True)
+        OneTimePassword.issue(self.user, OneTimePassword.VERIFY_EMAIL, '123456')
+        response = self.verify_email('123456')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['message'], 'Email already verified.')
+        self.assertTrue(OneTimePassword.objects.filter(user=self.user).exists())
+
+
+@override_settings(EMAIL_QUEUE_ASYNC=False)
+class UserSignalQueryCountTest(TestCase):
+    """Saving a user must not cascade into profile and calorie goal writes."""
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+
+    def test_registration_queries(self):
+        # email check, user + profile inserts, user lookup, OTP upsert (with savepoints)
+        with self.assertNumQueries(10):
+            response = RegisterUserView.as_view()(self.factory.post('/', {
+                'email': 'new@example.com', 'first_name': 'N', 'last_name': 'U',
+                'password': 'pass1234', 'password2': 'pass1234',
+            }, format='json'))
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_login_queries(self):
+        User.objects.create_user(
+            email='login@example.com', password='pass1234', first_name='L', last_name='I', is_verified=True
+        )
+        # user lookup and the outstanding refresh token
+        with self.assertNumQueries(2):
+            response = LoginUserView.as_view()(self.factory.post('/', {
+                'email': 'login@example.com', 'password': 'pass1234',
+            }, format='json'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_user_save_does_not_touch_profile(self):
+        user = User.objects.create_user(email='save@example.com', password='pass1234', first_name='S', last_name='V')
+        with self.assertNumQueries(1):
+            user.save()
+
+    def test_only_goal_field_changes_recompute_goals(self):
+        user = User.objects.create_user(email='goal@example.com', password='pass1234', first_name='G', last_name='O')
+        profile = Profile.objects.get(user=user)
+        profile.weight, profile.height, profile.age, profile.gender = 70, 170, 30, 'Male'
+        profile.save()
+        self.assertTrue(CalorieGoals.objects.filter(user=user).exists())
+
+        profile = Profile.objects.get(user=user)
+        profile.therapy = 'Insulin'
+        with self.assertNumQueries(1):
+            profile.save()
+
+        # profile update, user, goals lookup and update
+        profile.weight = 80
+        with self.assertNumQueries(4):
+            profile.save()
+        self.assertGreater(CalorieGoals.objects.get(user=user).daily_calorie_goal, Decimal('1941'))
@@ -4,7 +4,8 @@ from django.core.mail import EmailMultiAlternatives
 from django.template.loader import render_to_string
 from django.utils.html import strip_tags
 from django.conf import settings
-from .models import User, OneTimePassword ,PasswordResetOTP
+from .models import User, OneTimePassword
+from .email_queue import send_email
 from django.template.loader import render_to_string
 import pytz
 from django.utils import timezone
@@ -22,7 +23,7 @@ def send_code_to_user(email):
         return {"success": False, "message": "User with this email does not exist."}
 
     otp = generate_otp()
-    OneTimePassword.objects.create(user=user, code=otp)
+    OneTimePassword.issue(user, OneTimePassword.VERIFY_EMAIL, otp)
 
     # Load email template
     context = {
@@ -34,10 +35,10 @@ def send_code_to_user(email):
     html_content = render_to_string("emails/otp_email.html", context)  # HTML template
     text_content = strip_tags(html_content)  # Fallback for email clients that don't support HTML
 
-    # Send email
+    # Queue email; it is sent by the background sender
     email_message = EmailMultiAlternatives(subject, text_content, from_email, [email])
     email_message.attach_alternative(html_content, "text/html")
-    email_message.send(fail_silently=False)
+    send_email(email_message)
 
     return {"success": True, "message": "OTP sent successfully."}
 
@@ -50,7 +51,7 @@ def send_password_reset_code_to_user(email):
         return {"success": False, "message": "User with this email does not exist."}
 
     otp = generate_otp()
-    PasswordResetOTP.objects.create(user=user, code=otp)
+    OneTimePassword.issue(user, OneTimePassword.PASSWORD_RESET, otp)
 
     # Load email template
     context = {
@@ -62,10 +63,10 @@ def send_password_reset_code_to_user(email):
     html_content = render_to_string("emails/otp_email_password.html", context)  # HTML template
     text_content = strip_tags(html_content)  # Fallback for email clients that don't support HTML
 
-    # Send email
+    # Queue email; it is sent by the background sender
     email_message = EmailMultiAlternatives(subject, text_content, from_email, [email])
     email_message.attach_alternative(html_content, "text/html")
-    email_message.send(fail_silently=False)
+    send_email(email_message)
 
     return {"success": True, "message": "OTP sent successfully."}
 
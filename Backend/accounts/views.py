@@ -10,7 +10,7 @@ from rest_framework import status
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from .utlis import send_code_to_user, send_password_reset_code_to_user
-from .models import OneTimePassword, User, Profile, PasswordResetOTP
+from .models import OneTimePassword, User, Profile
 from django.utils.http import urlsafe_base64_decode
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.views import APIView
@@ -48,32 +48,30 @@ class VerifyUserEmail(GenericAPIView):
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+        email = serializer.validated_data.get('email')
         otp_code = serializer.validated_data.get('otp') 
 
-        try:
-            otp_entry = OneTimePassword.objects.get(code=otp_code)
-            user = otp_entry.user
+        user = User.objects.filter(email=email).first()
+        # Checked first so a verified user's code is not consumed for nothing
+        if user is not None and user.is_verified:
+            return Response({'message': 'Email already verified.'}, status=status.HTTP_400_BAD_REQUEST)
 
-            if user.is_verified:
-                return Response({'message': 'Email already verified.'}, status=status.HTTP_400_BAD_REQUEST)
-
-            # Verify the user
-            user.is_verified = True
-            user.save()
-            otp_entry.delete()
+        if user is None or not OneTimePassword.verify(user, OneTimePassword.VERIFY_EMAIL, otp_code):
+            return Response({'message': 'Invalid or expired OTP code.'}, status=status.HTTP_400_BAD_REQUEST)
 
-            # Generate authentication tokens
-            refresh = RefreshToken.for_user(user)
-            access_token = str(refresh.access_token)
+        # Verify the user
+        user.is_verified = True
+        user.save()
 
-            return Response({
-                'message': 'Email verified successfully.',
-                'access_token': access_token,
-                'refresh_token': str(refresh),
-            }, status=status.HTTP_200_OK)
+        # Generate authentication tokens
+        refresh = RefreshToken.for_user(user)
+        access_token = str(refresh.access_token)
 
-        except OneTimePassword.DoesNotExist:
-            return Response({'message': 'Invalid OTP code.'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({
+            'message': 'Email verified successfully.',
+            'access_token': access_token,
+            'refresh_token': str(refresh),
+        }, status=status.HTTP_200_OK)
 
 class LoginUserView(GenericAPIView):
     permission_classes = [AllowAny]
@@ -109,23 +107,21 @@ class ConfirmResetOTPView(APIView):
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+        email = serializer.validated_data.get('email')
         otp_code = serializer.validated_data.get('otp') 
 
-        try:
-            otp_entry = PasswordResetOTP.objects.get(code=otp_code)
-            user = otp_entry.user
-
-            refresh = RefreshToken.for_user(user)
-            access_token = str(refresh.access_token)
+        user = User.objects.filter(email=email).first()
+        if user is None or not OneTimePassword.verify(user, OneTimePassword.PASSWORD_RESET, otp_code):
+            return Response({'message': 'Invalid or expired OTP code.'}, status=status.HTTP_400_BAD_REQUEST)
 
-            return Response({
-                'message': 'OTP verified successfully. You can now reset your password.',
-                'access_token': access_token,
-                'refresh_token': str(refresh)
-            }, status=status.HTTP_200_OK)
+        refresh = RefreshToken.for_user(user)
+        access_token = str(refresh.access_token)
 
-        except PasswordResetOTP.DoesNotExist:
-            return Response({'message': 'Invalid or expired OTP code.'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({
+            'message': 'OTP verified successfully. You can now reset your password.',
+            'access_token': access_token,
+            'refresh_token': str(refresh)
+        }, status=status.HTTP_200_OK)
 
 
 
@@ -142,7 +138,7 @@ class ResetPasswordView(APIView):
                 user.set_password(new_password)
                 user.save()
                 
-                PasswordResetOTP.objects.filter(user=user).delete()
+                OneTimePassword.objects.filter(user=user, purpose=OneTimePassword.PASSWORD_RESET).delete()
                 
                 return Response({
                     'message': 'Password reset successful.'
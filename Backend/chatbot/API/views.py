@@ -122,7 +122,6 @@ def generate_conversation_summary(conversation):
     return summary if summary else "No previous conversation history."
 
 
-import pytz
 from django.utils.timezone import is_naive, make_aware
 
 @api_view(['GET'])
@@ -131,13 +130,8 @@ def conversation_detail(request):
     conversation = get_user_conversation(user_id)
     messages = ChatMessage.objects.filter(session=conversation).order_by('timestamp')
 
-    # Get the user timezone from headers (e.g., 'Africa/Cairo')
-    user_tz_str = request.headers.get('User-Timezone', 'UTC')
-
-    try:
-        user_tz = pytz.timezone(user_tz_str)
-    except pytz.UnknownTimeZoneError:
-        return Response({"error": f"Invalid timezone '{user_tz_str}'"}, status=400)
+    # Resolved from the User-Timezone header (e.g., 'Africa/Cairo') by TimezoneMiddleware
+    user_tz = request.user_timezone
 
     # Serialize messages manually to include local time
     response_data = []
@@ -1,6 +1,14 @@
 from django.apps import AppConfig
+from django.conf import settings
+import threading
 
 
 class DiabetisConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'diabetis'
+
+    def ready(self):
+        # Load and warm up the glucose model in the background so the first measurement is fast
+        if getattr(settings, 'GLUCOSE_MODEL_WARMUP', False):
+            from .predictor import warm_up_predictor
+            threading.Thread(target=warm_up_predictor, daemon=True).start()
@@ -0,0 +1,138 @@
+"""Storage and downsampling of continuous glucose monitor (CGM) streams.
+
+Readings are kept per user and UTC day in CGMDay rows as two packed arrays
+instead of one BloodGlucose row each. Timestamps travel through this module
+as int64 seconds since the Unix epoch.
+"""
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+import numpy as np
+from django.db import transaction
+from django.utils import timezone
+from .models import CGMDay
+
+SECONDS_PER_DAY = 86400
+VALUE_SCALE = 10  # values are stored in tenths of mg/dL
+MAX_VALUE = np.iinfo(np.uint16).max / VALUE_SCALE
+EPOCH_DAY = date(1970, 1, 1)
+
+# Chart resolutions accepted by the query view, in seconds
+RESOLUTIONS = {'5m': 300, '15m': 900, '1h': 3600, '4h': 14400, '1d': SECONDS_PER_DAY}
+
+
+def pack_day(offsets, values):
+    """Pack sorted offsets (seconds since midnight UTC) and mg/dL values into bytes."""
+    packed_values = np.rint(np.clip(values, 0, MAX_VALUE) * VALUE_SCALE).astype('<u2')
+    return np.asarray(offsets, dtype='<u4').tobytes(), packed_values.tobytes()
+
+
+def unpack_day(cgm_day):
+    """Epoch seconds and mg/dL values of a CGMDay."""
+    start = (cgm_day.day - EPOCH_DAY).days * SECONDS_PER_DAY
+    offsets = np.frombuffer(bytes(cgm_day.offsets), dtype='<u4').astype(np.int64)
+    values = np.frombuffer(bytes(cgm_day.values), dtype='<u2') / VALUE_SCALE
+    return start + offsets, values
+
+
+def ingest_readings(user, timestamps, values):
+    """Merge readings (epoch seconds, mg/dL) into the user's CGMDay rows.
+
+    A new reading at an already stored second replaces the old value, so
+    uploads can be retried safely. Returns the number of days touched.
+    """
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    values = np.asarray(values, dtype=np.float64)
+    if timestamps.size == 0:
+        return 0
+
+    day_numbers = timestamps // SECONDS_PER_DAY
+    order = np.argsort(day_numbers, kind='stable')
+    unique_days, boundaries = np.unique(day_numbers[order], return_index=True)
+    groups = np.split(order, boundaries[1:])
+    days = [EPOCH_DAY + timedelta(days=int(day_number)) for day_number in unique_days]
+    now = timezone.now()
+
+    with transaction.atomic():
+        existing = {
+            cgm_day.day: cgm_day
+            for cgm_day in CGMDay.objects.select_for_update().filter(user=user, day__in=days)
+        }
+        created, updated = [], []
+        for day_number, day, rows in zip(unique_days, days, groups):
+            day_start = day_number * SECONDS_PER_DAY
+            day_offsets = timestamps[rows] - day_start
+            day_values = values[rows]
+
+            cgm_day = existing.get(day)
+            if cgm_day is not None:
+                old_timestamps, old_values = unpack_day(cgm_day)
+                # Old readings first so np.unique keeps the newest value of a duplicate second
+                day_offsets = np.concatenate([old_timestamps - day_start, day_offsets])
+                day_values = np.concatenate([old_values, day_values])
+            # Last occurrence of every second, sorted by time
+            reversed_offsets = day_offsets[::-1]
+            kept_offsets, positions = np.unique(reversed_offsets, return_index=True)
+            kept_values = day_values[::-1][positions]
+
+            packed_offsets, packed_values = pack_day(kept_offsets, kept_values)
+            if cgm_day is None:
+                created.append(CGMDay(user=user, day=day, offsets=packed_offsets,
+                                      values=packed_values, count=len(kept_offsets)))
+            else:
+                cgm_day.offsets, cgm_day.values, cgm_day.count = packed_offsets, packed_values, len(kept_offsets)
+                cgm_day.updated_at = now
+                updated.append(cgm_day)
+
+        CGMDay.objects.bulk_create(created)
+        CGMDay.objects.bulk_update(updated, ['offsets', 'values', 'count', 'updated_at'])
+    return len(days)
+
+
+def load_readings(user, start, end):
+    """Readings of `user` with start <= time < end (aware datetimes), as epoch seconds and mg/dL."""
+    start_ts, end_ts = int(start.timestamp()), int(end.timestamp())
+    first_day = EPOCH_DAY + timedelta(days=start_ts // SECONDS_PER_DAY)
+    last_day = EPOCH_DAY + timedelta(days=(end_ts - 1) // SECONDS_PER_DAY)
+
+    timestamps, values = [np.zeros(0, dtype=np.int64)], [np.zeros(0)]
+    for cgm_day in CGMDay.objects.filter(user=user, day__gte=first_day, day__lte=last_day).order_by('day'):
+        day_timestamps, day_values = unpack_day(cgm_day)
+        timestamps.append(day_timestamps)
+        values.append(day_values)
+    timestamps, values = np.concatenate(timestamps), np.concatenate(values)
+    in_range = (timestamps >= start_ts) & (timestamps < end_ts)
+    return timestamps[in_range], values[in_range]
+
+
+def downsample(timestamps, values, bucket_seconds, origin=0):
+    """Mean/min/max per bucket of `bucket_seconds`, aligned to `origin` (epoch seconds).
+
+    Returns (bucket starts, means, minimums, maximums, counts) for the
+    non-empty buckets only. `timestamps` must be sorted.
+    """
+    if timestamps.size == 0:
+        empty = np.zeros(0)
+        return empty.astype(np.int64), empty, empty, empty, empty.astype(np.int64)
+    buckets = (timestamps - origin) // bucket_seconds
+    starts = np.flatnonzero(np.diff(buckets, prepend=buckets[0] - 1))
+    counts = np.diff(np.append(starts, timestamps.size))
+    means = np.add.reduceat(values, starts) / counts
+    return (
+        origin + buckets[starts] * bucket_seconds,
+        means,
+        np.minimum.reduceat(values, starts),
+        np.maximum.reduceat(values, starts),
+        counts,
+    )
+
+
+def pick_resolution(start, end, max_points=300):
+    """Smallest RESOLUTIONS entry that keeps [start, end) under `max_points` buckets."""
+    span = (end - start).total_seconds()
+    for name, seconds in RESOLUTIONS.items():
+        if span / seconds <= max_points:
+            return name
+    return '1d'
+
+
+def to_datetime(timestamp):
+    return datetime.fromtimestamp(int(timestamp), tz=dt_timezone.utc)
@@ -0,0 +1,142 @@
+"""Bulk import of glucose readings from CSV exports.
+
+Two layouts are understood:
+
+* ``date,time,code,value`` (the AIM diabetes dataset, see Data/Tracking/blood_glucose.csv)
+  where ``code`` tells the time of measurement;
+* ``datetime,value`` (CGM exports such as glucose_readings10.csv).
+
+Files are read row by row and written in chunks, so a year of CGM data never
+sits in memory at once.
+"""
+import codecs
+import csv
+from datetime import datetime
+import numpy as np
+from django.db import transaction
+from accounts.middleware import make_local
+from .models import BloodGlucose
+from .predictor import schedule_prediction
+from .utils import classify_glucose_array
+
+CHUNK_SIZE = 5000
+
+# AIM dataset codes for blood glucose measurements; anything else is "Random"
+AIM_CODE_TIMES = {
+    '58': 'Pre-Breakfast',
+    '59': 'Post-Breakfast',
+    '60': 'Pre-Lunch',
+    '61': 'Post-Lunch',
+    '62': 'Pre-Dinner',
+    '63': 'Post-Dinner',
+}
+
+DATETIME_FORMATS = ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%dT%H:%M:%S', '%m-%d-%Y %H:%M')
+
+
+def parse_local_datetime(value):
+    for fmt in DATETIME_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def iter_rows(lines):
+    """Yield (naive local datetime, value, time_of_measurement) for every usable CSV row.
+
+    Returns the number of skipped rows through StopIteration.value.
+    """
+    reader = csv.DictReader(lines)
+    fields = set(reader.fieldnames or ())
+    if {'date', 'time', 'value'} <= fields:
+        layout = 'aim'
+    elif {'datetime', 'value'} <= fields:
+        layout = 'cgm'
+    else:
+        raise ValueError("CSV must have date,time,code,value or datetime,value columns.")
+
+    skipped = 0
+    for row in reader:
+        if layout == 'aim':
+            moment = parse_local_datetime(f"{row['date']} {row['time']}")
+            time_of_measurement = AIM_CODE_TIMES.get((row.get('code') or '').strip(), 'Random')
+        else:
+            moment = parse_local_datetime(row['datetime'])
+            time_of_measurement = 'Random'
+        try:
+            value = float(row['value'])
+        except (TypeError, ValueError):
+            value = 0.0
+        if moment is None or value <= 0:
+            skipped += 1
+            continue
+        yield moment, value, time_of_measurement
+    return skipped
+
+
+def import_readings(user, stream, user_tz, chunk_size=CHUNK_SIZE):
+    """Import the CSV byte stream `stream` for `user`; timestamps are local to `user_tz`.
+
+    Readings already stored at the same instant are skipped, so re-importing a
+    file is harmless. The latest reading is forecast once, after the import.
+    Returns a dict with the imported and skipped counts.
+    """
+    rows = iter_rows(codecs.iterdecode(stream, 'utf-8-sig'))
+    imported = skipped = 0
+
+    def flush(chunk):
+        times = [make_local(user_tz, moment) for moment, _, _ in chunk]
+        values = np.array([value for _, value, _ in chunk])
+        labels = np.array([time_of_measurement for _, _, time_of_measurement in chunk])
+        severities = classify_glucose_array(values, labels)
+
+        existing = set(
+            BloodGlucose.objects
+            .filter(user=user, created_at__gte=min(times), created_at__lte=max(times))
+            .values_list('created_at', flat=True)
+        )
+        new = []
+        for created_at, value, time_of_measurement, severity in zip(times, values, labels, severities):
+            # Skip readings already stored and repeated rows within the file
+            if created_at in existing:
+                continue
+            existing.add(created_at)
+            new.append(BloodGlucose(
+                user=user,
+                blood_glucose=float(value),
+                time_of_measurement=time_of_measurement,
+                severity=severity,
+                forecast_skipped=True,  # historical readings are not forecast one by one
+                created_at=created_at,
+            ))
+        BloodGlucose.objects.bulk_create(new, batch_size=1000)
+        return len(new), len(chunk) - len(new)
+
+    chunk = []
+    while True:
+        try:
+            chunk.append(next(rows))
+        except StopIteration as stop:
+            skipped += stop.value or 0
+            break
+        if len(chunk) >= chunk_size:
+            with transaction.atomic():
+                added, duplicates = flush(chunk)
+            imported += added
+            skipped += duplicates
+            chunk = []
+    if chunk:
+        with transaction.atomic():
+            added, duplicates = flush(chunk)
+        imported += added
+        skipped += duplicates
+
+    if imported:
+        latest = BloodGlucose.objects.filter(user=user).order_by('-created_at', '-id').first()
+        if latest.forecast_skipped:
+            BloodGlucose.objects.filter(pk=latest.pk).update(forecast_skipped=False)
+            schedule_prediction(latest.pk)
+
+    return {'imported': imported, 'skipped': skipped}
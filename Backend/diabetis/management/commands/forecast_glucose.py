@@ -0,0 +1,81 @@
+from datetime import timedelta
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+from diabetis.models import BloodGlucose, GlucoseForecast
+from diabetis.predictor import GlucosePredictor, SEQUENCE_LENGTH
+
+
+class Command(BaseCommand):
+    help = 'Forecast the next glucose reading of every active user in large batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--active-days', type=int, default=30,
+                            help='Only users with a reading in the last N days (default: 30)')
+        parser.add_argument('--batch-size', type=int, default=4096,
+                            help='Users per model call (default: 4096)')
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        active_users = (
+            BloodGlucose.objects
+            .filter(created_at__gte=now - timedelta(days=options['active_days']))
+            .values('user_id')
+            .distinct()
+        )
+
+        # Last SEQUENCE_LENGTH readings of every active user in one query
+        rows = (
+            BloodGlucose.objects
+            .filter(user_id__in=active_users)
+            .annotate(position=Window(
+                expression=RowNumber(),
+                partition_by=[F('user_id')],
+                order_by=[F('created_at').desc(), F('id').desc()],
+            ))
+            .filter(position__lte=SEQUENCE_LENGTH)
+            .order_by('user_id', 'position')
+            .values_list('user_id', 'id', 'blood_glucose', 'position')
+        )
+
+        user_ids, latest_ids, sequences = [], [], []
+        current_user, current_values, current_latest = None, [], None
+        for user_id, measurement_id, value, position in rows.iterator(chunk_size=10000):
+            if user_id != current_user:
+                if len(current_values) == SEQUENCE_LENGTH:
+                    user_ids.append(current_user)
+                    latest_ids.append(current_latest)
+                    sequences.append(current_values[::-1])
+                current_user, current_values, current_latest = user_id, [], measurement_id
+            current_values.append(value)
+        if len(current_values) == SEQUENCE_LENGTH:
+            user_ids.append(current_user)
+            latest_ids.append(current_latest)
+            sequences.append(current_values[::-1])
+
+        if not sequences:
+            self.stdout.write('No user has enough readings to forecast')
+            return
+
+        # (N, 16) readings -> one GRU call per batch
+        predictor = GlucosePredictor.get()
+        sequences = np.asarray(sequences, dtype=np.float64)
+        batch_size = max(1, options['batch_size'])
+        forecasts = np.concatenate([
+            predictor.predict_batch(sequences[start:start + batch_size], batch_size=batch_size)
+            for start in range(0, len(sequences), batch_size)
+        ])
+
+        GlucoseForecast.objects.bulk_create(
+            [
+                GlucoseForecast(user_id=user_id, predicted_glucose=float(forecast), based_on_id=latest_id, updated_at=now)
+                for user_id, latest_id, forecast in zip(user_ids, latest_ids, forecasts)
+            ],
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['user'],
+            update_fields=['predicted_glucose', 'based_on', 'updated_at'],
+        )
+        self.stdout.write(self.style.SUCCESS(f'Forecasted the next reading for {len(user_ids)} users'))
@@ -0,0 +1,36 @@
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from django.core.management.base import BaseCommand, CommandError
+from accounts.models import User
+from diabetis.importer import import_readings, CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Import glucose readings for a user from a CSV file (AIM or CGM export layout)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV file with date,time,code,value or datetime,value columns')
+        parser.add_argument('--user', required=True, help='Email of the user the readings belong to')
+        parser.add_argument('--timezone', default='UTC', help='Timezone of the timestamps in the file (default: UTC)')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE,
+                            help=f'Rows written per transaction (default: {CHUNK_SIZE})')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(email=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"No user with email {options['user']}")
+        try:
+            # Same zone database as accounts.middleware.resolve_timezone, but a typo is an error here
+            user_tz = ZoneInfo(options['timezone'])
+        except (ZoneInfoNotFoundError, ValueError):
+            raise CommandError(f"Unknown timezone {options['timezone']}")
+
+        try:
+            with open(options['path'], 'rb') as stream:
+                result = import_readings(user, stream, user_tz, chunk_size=max(1, options['chunk_size']))
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {result['imported']} readings ({result['skipped']} skipped)"
+        ))
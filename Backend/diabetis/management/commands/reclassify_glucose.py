@@ -0,0 +1,41 @@
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from diabetis.models import BloodGlucose
+from diabetis.utils import classify_glucose_array
+
+
+class Command(BaseCommand):
+    help = 'Recompute the severity of stored glucose readings, e.g. after THRESHOLDS change'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=10000,
+                            help='Readings classified per batch (default: 10000)')
+
+    def handle(self, *args, **options):
+        chunk_size = max(1, options['chunk_size'])
+        updated = 0
+        last_id = 0
+        while True:
+            rows = list(
+                BloodGlucose.objects
+                .filter(id__gt=last_id)
+                .order_by('id')
+                .values_list('id', 'blood_glucose', 'time_of_measurement', 'severity')[:chunk_size]
+            )
+            if not rows:
+                break
+            last_id = rows[-1][0]
+
+            ids, values, times, severities = zip(*rows)
+            labels = classify_glucose_array(np.array(values), times)
+            changed = [
+                BloodGlucose(id=measurement_id, severity=label)
+                for measurement_id, label, severity in zip(ids, labels, severities)
+                if label != severity
+            ]
+            with transaction.atomic():
+                BloodGlucose.objects.bulk_update(changed, ['severity'], batch_size=1000)
+            updated += len(changed)
+
+        self.stdout.write(self.style.SUCCESS(f'Reclassified {updated} readings'))
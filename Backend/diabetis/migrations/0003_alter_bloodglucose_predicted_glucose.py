@@ -0,0 +1,18 @@
+# Generated by Django 4.2.16 on 2026-10-19 18:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('diabetis', '0002_alter_bloodglucose_created_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='bloodglucose',
+            name='predicted_glucose',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.16 on 2026-10-19 18:59
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('diabetis', '0003_alter_bloodglucose_predicted_glucose'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GlucoseForecast',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('predicted_glucose', models.FloatField()),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('based_on', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='diabetis.bloodglucose')),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='glucose_forecast', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
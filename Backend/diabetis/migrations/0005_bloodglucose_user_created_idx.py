@@ -0,0 +1,17 @@
+# Generated by Django 4.2.16 on 2026-10-19 19:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('diabetis', '0004_glucoseforecast'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bloodglucose',
+            index=models.Index(fields=['user', '-created_at'], name='bloodglucose_user_created_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.16 on 2026-10-19 19:04
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('diabetis', '0005_bloodglucose_user_created_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CGMDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('offsets', models.BinaryField()),
+                ('values', models.BinaryField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cgm_days', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='cgmday',
+            constraint=models.UniqueConstraint(fields=('user', 'day'), name='cgmday_unique_user_day'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.16 on 2026-10-19 19:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('diabetis', '0006_cgmday'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bloodglucose',
+            name='forecast_skipped',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -20,11 +20,47 @@ class BloodGlucose(models.Model):
     blood_glucose = models.FloatField()
     time_of_measurement = models.CharField(max_length=20, choices=TIME_CHOICES)
     severity = models.CharField(max_length=50)
-    predicted_glucose = models.FloatField()
+    predicted_glucose = models.FloatField(null=True, blank=True)  # None while the forecast is pending
+    forecast_skipped = models.BooleanField(default=False)  # bulk-imported history, never forecast
     created_at = models.DateTimeField(default=timezone.now)
     
     def __str__(self):
         return f"{self.user} - {self.blood_glucose} - {self.time_of_measurement} - {self.severity} - {self.predicted_glucose}"
     
     class Meta:
-        ordering = ['-created_at']
\ No newline at end of file
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='bloodglucose_user_created_idx'),
+        ]
+
+class GlucoseForecast(models.Model):
+    """Forecast of a user's next reading, refreshed in bulk by the forecast_glucose command."""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='glucose_forecast')
+    predicted_glucose = models.FloatField()
+    based_on = models.ForeignKey(BloodGlucose, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.user} - {self.predicted_glucose}"
+
+class CGMDay(models.Model):
+    """One UTC day of continuous glucose monitor readings for a user, stored as packed arrays.
+
+    `offsets` holds uint32 seconds since midnight UTC and `values` uint16
+    tenths of mg/dL, both sorted by time (see diabetis.cgm). 288 readings a
+    day take about 1.7 KB in a single row.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='cgm_days')
+    day = models.DateField()
+    offsets = models.BinaryField(editable=False)
+    values = models.BinaryField(editable=False)
+    count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'day'], name='cgmday_unique_user_day'),
+        ]
+
+    def __str__(self):
+        return f"{self.user} - {self.day} - {self.count} readings"
@@ -0,0 +1,8 @@
+from project.pagination import OptInCursorPagination
+
+
+class BloodGlucoseCursorPagination(OptInCursorPagination):
+    """Newest-first cursor pagination over (created_at, id)."""
+    page_size = 50
+    max_page_size = 500
+    ordering = ('-created_at', '-id')
@@ -0,0 +1,143 @@
+# glucose/predictor.py
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import joblib
+import numpy as np
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+logger = logging.getLogger(__name__)
+
+# Number of past readings the GRU model looks at
+SEQUENCE_LENGTH = 16
+
+
+class GlucosePredictor:
+    """GRU model + scaler, loaded once per process and shared by every request."""
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self, model_path, scaler_path):
+        from tensorflow.keras.models import load_model
+        self.scaler = joblib.load(scaler_path)
+        self.model = load_model(model_path, compile=False)
+
+    @classmethod
+    def get(cls):
+        """Return the process-wide predictor, loading it on first use (thread-safe)."""
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = cls(settings.GLUCOSE_MODEL_PATH, settings.GLUCOSE_SCALER_PATH)
+        return cls._instance
+
+    def warm_up(self):
+        """Run one dummy inference so the first real request does not pay for graph tracing."""
+        self.model(np.zeros((1, SEQUENCE_LENGTH, 1), dtype=np.float32), training=False)
+
+    def predict_next(self, values):
+        """Predict the reading that follows the last SEQUENCE_LENGTH values (oldest first)."""
+        values = np.asarray(values, dtype=np.float64).reshape(-1, 1)[-SEQUENCE_LENGTH:]
+        scaled = self.scaler.transform(values).reshape(1, SEQUENCE_LENGTH, 1).astype(np.float32)
+        prediction = np.asarray(self.model(scaled, training=False)).reshape(-1, 1)
+        return float(self.scaler.inverse_transform(prediction)[0][0])
+
+    def predict_batch(self, sequences, batch_size=1024):
+        """Predict the next reading for many users at once.
+
+        ``sequences`` is an (N, SEQUENCE_LENGTH) array of readings, oldest first;
+        returns an (N,) array of forecasts in mg/dL.
+        """
+        sequences = np.asarray(sequences, dtype=np.float64)
+        if sequences.size == 0:
+            return np.zeros(0)
+        scaled = self.scaler.transform(sequences.reshape(-1, 1)).reshape(-1, SEQUENCE_LENGTH, 1).astype(np.float32)
+        predictions = self.model.predict(scaled, batch_size=batch_size, verbose=0).reshape(-1, 1)
+        return self.scaler.inverse_transform(predictions).reshape(-1)
+
+    def forecast_horizon(self, values, steps):
+        """Roll the model forward autoregressively for `steps` readings.
+
+        The window stays a scaled tensor for the whole rollout; the scaler is
+        applied once before and once after. Returns an array of `steps` forecasts.
+        """
+        import tensorflow as tf
+
+        values = np.asarray(values, dtype=np.float64).reshape(-1, 1)[-SEQUENCE_LENGTH:]
+        window = tf.constant(self.scaler.transform(values).reshape(1, SEQUENCE_LENGTH, 1), dtype=tf.float32)
+        predictions = []
+        for _ in range(steps):
+            prediction = tf.reshape(self.model(window, training=False), (1, 1, 1))
+            predictions.append(prediction)
+            window = tf.concat([window[:, 1:, :], prediction], axis=1)
+        scaled = tf.concat(predictions, axis=1).numpy().reshape(-1, 1)
+        return self.scaler.inverse_transform(scaled).reshape(-1)
+
+
+def warm_up_predictor():
+    GlucosePredictor.get().warm_up()
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def get_executor():
+    """Thread pool running glucose predictions off the request path."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'GLUCOSE_PREDICTION_WORKERS', 2),
+                    thread_name_prefix='glucose-forecast',
+                )
+    return _executor
+
+
+def predict_measurement(measurement_id):
+    """Fill in predicted_glucose of a saved measurement from the readings before it."""
+    from .models import BloodGlucose
+
+    close_old_connections()
+    try:
+        measurement = BloodGlucose.objects.filter(pk=measurement_id).first()
+        if measurement is None:
+            return None
+
+        previous_values = list(
+            BloodGlucose.objects
+            .filter(user_id=measurement.user_id, created_at__lte=measurement.created_at)
+            .exclude(pk=measurement.pk)
+            .order_by('-created_at', '-id')
+            .values_list('blood_glucose', flat=True)[:SEQUENCE_LENGTH]
+        )[::-1]
+
+        if len(previous_values) < SEQUENCE_LENGTH:
+            predicted_glucose = 0.0
+        else:
+            predicted_glucose = GlucosePredictor.get().predict_next(previous_values)
+
+        BloodGlucose.objects.filter(pk=measurement_id).update(predicted_glucose=predicted_glucose)
+        return predicted_glucose
+    except Exception:
+        logger.exception("Glucose prediction failed for measurement %s", measurement_id)
+        return None
+    finally:
+        close_old_connections()
+
+
+def schedule_prediction(measurement_id):
+    """Queue the prediction of a measurement once the current transaction commits.
+
+    With GLUCOSE_PREDICTION_ASYNC = False (e.g. in tests) it runs inline instead.
+    """
+    def submit():
+        if getattr(settings, 'GLUCOSE_PREDICTION_ASYNC', True):
+            get_executor().submit(predict_measurement, measurement_id)
+        else:
+            predict_measurement(measurement_id)
+
+    transaction.on_commit(submit)
@@ -1,3 +1,386 @@
-from django.test import TestCase
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import BytesIO, StringIO
+from unittest import mock
+import time
+from zoneinfo import ZoneInfo
 
-# Create your tests here.
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from accounts.middleware import local_day_bounds
+from . import cgm
+from .importer import import_readings
+from .models import BloodGlucose, CGMDay, GlucoseForecast
+from .predictor import GlucosePredictor, SEQUENCE_LENGTH
+from .views import (
+    AllMeasurementsAPIView, CGMReadingsAPIView, ForecastHorizonAPIView, GlucoseStatisticsAPIView, LatestForecastAPIView,
+)
+from .utils import THRESHOLDS, classify_glucose, classify_glucose_array
+
+
+def call_view(view_class, method, user, user_tz, today, **kwargs):
+    """Run an APIView as `user`, with the attributes TimezoneMiddleware would set."""
+    request = getattr(APIRequestFactory(), method)('/diabetis/', format='json', **kwargs)
+    force_authenticate(request, user=user)
+    request.user_timezone = user_tz
+    request.local_day = local_day_bounds(user_tz, today)
+    return view_class.as_view()(request)
+
+
+class FakeScaler:
+    def transform(self, values):
+        return np.asarray(values) / 100
+
+    def inverse_transform(self, values):
+        return np.asarray(values) * 100
+
+
+class FakeGRU:
+    """Predicts the mean of the (scaled) input window."""
+
+    def __call__(self, windows, training=False):
+        return np.asarray(windows).mean(axis=1)
+
+    def predict(self, windows, batch_size=None, verbose=0):
+        return self(windows)
+
+
+def fake_predictor_init(predictor, model_path, scaler_path):
+    time.sleep(0.01)  # widen the window for concurrent first calls
+    fake_predictor_init.loads += 1
+    predictor.scaler, predictor.model = FakeScaler(), FakeGRU()
+
+fake_predictor_init.loads = 0
+
+
+class ClassifyGlucoseArrayTest(SimpleTestCase):
+    """The vectorized classifier must agree with the scalar one label for label."""
+
+    TIMES = list(THRESHOLDS) + ['Bedtime', '']
+
+    def assert_agrees(self, values, times):
+        expected = [classify_glucose(value, time_of_day) for value, time_of_day in zip(values, times)]
+        self.assertEqual(list(classify_glucose_array(values, times)), expected)
+
+    def test_random_values_agree(self):
+        rng = np.random.default_rng(45)
+        for _ in range(50):
+            size = int(rng.integers(1, 200))
+            values = rng.uniform(-50, 600, size)
+            times = rng.choice(self.TIMES, size)
+            self.assert_agrees(values, times)
+
+    def test_threshold_boundaries_agree(self):
+        for time_of_day, thresholds in THRESHOLDS.items():
+            values = np.array([
+                value for threshold, _ in thresholds
+                for value in (np.nextafter(threshold, -np.inf), threshold, np.nextafter(threshold, np.inf))
+            ])
+            self.assert_agrees(values, [time_of_day] * len(values))
+
+    def test_special_values_agree(self):
+        values = np.array([np.nan, np.inf, -np.inf, 0.0, -0.0])
+        self.assert_agrees(values, ['Random'] * len(values))
+
+    def test_empty_input(self):
+        self.assertEqual(len(classify_glucose_array(np.array([]), [])), 0)
+
+
+@mock.patch.object(GlucosePredictor, '__init__', fake_predictor_init)
+class GlucosePredictorTest(SimpleTestCase):
+    def setUp(self):
+        fake_predictor_init.loads = 0
+        GlucosePredictor._instance = None
+        self.addCleanup(setattr, GlucosePredictor, '_instance', None)
+
+    def test_model_is_loaded_once_for_concurrent_callers(self):
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            predictors = list(pool.map(lambda _: GlucosePredictor.get(), range(16)))
+        self.assertEqual(fake_predictor_init.loads, 1)
+        self.assertTrue(all(predictor is predictors[0] for predictor in predictors))
+
+    def test_predict_next_uses_the_last_window(self):
+        values = [50.0] * 4 + list(range(100, 100 + SEQUENCE_LENGTH))
+        self.assertAlmostEqual(GlucosePredictor.get().predict_next(values), 100 + (SEQUENCE_LENGTH - 1) / 2, places=3)
+
+
+@mock.patch.object(GlucosePredictor, '__init__', fake_predictor_init)
+class ForecastGlucoseCommandTest(TestCase):
+    def setUp(self):
+        GlucosePredictor._instance = None
+        self.addCleanup(setattr, GlucosePredictor, '_instance', None)
+        self.now = timezone.now()
+
+    def add_readings(self, email, values, start):
+        user = get_user_model().objects.create_user(email=email, password='pass1234', first_name='F', last_name='C')
+        readings = BloodGlucose.objects.bulk_create([
+            BloodGlucose(user=user, blood_glucose=value, time_of_measurement='Random', severity='Normal',
+                         created_at=start + timedelta(minutes=5 * i))
+            for i, value in enumerate(values)
+        ])
+        return user, readings
+
+    def test_users_with_a_full_recent_window_are_forecast(self):
+        start = self.now - timedelta(days=1)
+        active, readings = self.add_readings('active@example.com', range(100, 120), start)
+        other, other_readings = self.add_readings('other@example.com', [200] * SEQUENCE_LENGTH, start)
+        self.add_readings('short@example.com', [150] * (SEQUENCE_LENGTH - 1), start)
+        self.add_readings('idle@example.com', [150] * SEQUENCE_LENGTH, self.now - timedelta(days=60))
+
+        call_command('forecast_glucose', batch_size=1, stdout=StringIO())
+        forecasts = {forecast.user_id: forecast for forecast in GlucoseForecast.objects.all()}
+        self.assertEqual(set(forecasts), {active.id, other.id})
+        self.assertAlmostEqual(forecasts[active.id].predicted_glucose, np.mean(range(104, 120)), places=3)
+        self.assertEqual(forecasts[active.id].based_on_id, readings[-1].id)
+        self.assertAlmostEqual(forecasts[other.id].predicted_glucose, 200, places=3)
+
+        # A new reading moves the forecast on; the row is updated, not duplicated
+        latest = BloodGlucose.objects.create(user=active, blood_glucose=136, time_of_measurement='Random',
+                                             severity='Normal', created_at=self.now)
+        call_command('forecast_glucose', stdout=StringIO())
+        forecast = GlucoseForecast.objects.get(user=active)
+        self.assertEqual(forecast.based_on_id, latest.id)
+        self.assertAlmostEqual(forecast.predicted_glucose, np.mean(list(range(105, 120)) + [136]), places=3)
+        self.assertEqual(GlucoseForecast.objects.count(), 2)
+
+
+class CGMStorageTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='cgm@example.com', password='pass1234', first_name='C', last_name='G'
+        )
+        self.start = datetime(2026, 10, 16, tzinfo=dt_timezone.utc)
+
+    def test_readings_round_trip_across_days(self):
+        timestamps = int(self.start.timestamp()) + 300 * np.arange(288 * 2)
+        values = np.round(100 + 40 * np.sin(np.arange(288 * 2) / 15), 1)
+        self.assertEqual(cgm.ingest_readings(self.user, timestamps, values), 2)
+
+        loaded_timestamps, loaded_values = cgm.load_readings(
+            self.user, self.start, datetime(2026, 10, 18, tzinfo=dt_timezone.utc)
+        )
+        np.testing.assert_array_equal(loaded_timestamps, timestamps)
+        np.testing.assert_allclose(loaded_values, values)
+        self.assertEqual(CGMDay.objects.filter(user=self.user).count(), 2)
+
+    def test_reupload_replaces_readings_at_the_same_second(self):
+        first = int(self.start.timestamp())
+        cgm.ingest_readings(self.user, [first, first + 300], [100, 110])
+        cgm.ingest_readings(self.user, [first + 300, first + 600], [120, 130])
+
+        cgm_day = CGMDay.objects.get(user=self.user)
+        self.assertEqual(cgm_day.count, 3)
+        _, values = cgm.unpack_day(cgm_day)
+        np.testing.assert_allclose(values, [100, 120, 130])
+
+    def test_downsample_buckets(self):
+        timestamps = np.array([0, 60, 300, 960])
+        values = np.array([100.0, 110.0, 90.0, 150.0])
+        starts, means, minimums, maximums, counts = cgm.downsample(timestamps, values, 300)
+        np.testing.assert_array_equal(starts, [0, 300, 900])
+        np.testing.assert_allclose(means, [105, 90, 150])
+        np.testing.assert_allclose(minimums, [100, 90, 150])
+        np.testing.assert_allclose(maximums, [110, 90, 150])
+        np.testing.assert_array_equal(counts, [2, 1, 1])
+
+    def request(self, method, user_tz, **kwargs):
+        return call_view(CGMReadingsAPIView, method, self.user, user_tz, self.start.date(), **kwargs)
+
+    def test_naive_upload_times_are_local_to_the_user(self):
+        user_tz = ZoneInfo('Asia/Tokyo')
+        response = self.request('post', user_tz, data={'readings': [{'time': '2026-10-16T09:00:00', 'value': 100}]})
+        self.assertEqual(response.status_code, 201)
+        timestamps, _ = cgm.unpack_day(CGMDay.objects.get(user=self.user))
+        self.assertEqual(list(timestamps), [int(self.start.timestamp())])
+
+    def test_non_finite_values_are_rejected(self):
+        for value in ('NaN', 'Infinity'):
+            response = self.request('post', dt_timezone.utc, data={
+                'start': '2026-10-16T00:00:00Z', 'interval': 300, 'values': [100, value],
+            })
+            self.assertEqual(response.status_code, 400)
+        self.assertFalse(CGMDay.objects.exists())
+
+    def test_query_range_is_capped_with_an_explicit_resolution(self):
+        params = {'from': '2025-01-01', 'to': '2026-10-16', 'resolution': '1d'}
+        self.assertEqual(self.request('get', dt_timezone.utc, data=params).status_code, 400)
+        params = {'from': '2026-10-01', 'to': '2026-10-16', 'resolution': '5m'}
+        self.assertEqual(self.request('get', dt_timezone.utc, data=params).status_code, 400)
+        params['resolution'] = '1h'
+        self.assertEqual(self.request('get', dt_timezone.utc, data=params).status_code, 200)
+
+
+class ImportReadingsTest(TestCase):
+    CSV = (
+        b"datetime,value\n"
+        b"2026-10-16 08:00:00,110\n"
+        b"2026-10-16 08:05:00,115\n"
+        b"2026-10-16 08:05:00,115\n"
+        b"2026-10-16 08:10:00,not-a-number\n"
+    )
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='import@example.com', password='pass1234', first_name='I', last_name='M'
+        )
+
+    @mock.patch('diabetis.importer.schedule_prediction')
+    def test_duplicates_are_skipped_and_only_the_latest_is_forecast(self, schedule_prediction):
+        user_tz = ZoneInfo('Africa/Cairo')
+        result = import_readings(self.user, BytesIO(self.CSV), user_tz)
+        self.assertEqual(result, {'imported': 2, 'skipped': 2})
+
+        readings = list(BloodGlucose.objects.filter(user=self.user).order_by('created_at'))
+        self.assertEqual(readings[0].created_at, datetime(2026, 10, 16, 8, tzinfo=user_tz))
+        self.assertEqual([reading.forecast_skipped for reading in readings], [True, False])
+        self.assertEqual([reading.predicted_glucose for reading in readings], [None, None])
+        schedule_prediction.assert_called_once_with(readings[-1].pk)
+
+        # Importing the same file again adds nothing
+        self.assertEqual(import_readings(self.user, BytesIO(self.CSV), user_tz), {'imported': 0, 'skipped': 4})
+
+
+class ForecastHorizonTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email='forecast@example.com', password='pass1234', first_name='F', last_name='H'
+        )
+        self.start = datetime(2026, 10, 16, tzinfo=dt_timezone.utc)
+        BloodGlucose.objects.bulk_create([
+            BloodGlucose(user=self.user, blood_glucose=100 + i, time_of_measurement='Random', severity='Normal',
+                         created_at=self.start + timedelta(hours=i))
+            for i in range(SEQUENCE_LENGTH)
+        ])
+        self.predictor = mock.Mock()
+        self.predictor.forecast_horizon.side_effect = lambda values, steps: values[-1] + np.arange(1, steps + 1)
+
+    def forecast(self):
+        with mock.patch('diabetis.views.GlucosePredictor.get', return_value=self.predictor):
+            response = call_view(ForecastHorizonAPIView, 'get', self.user, dt_timezone.utc,
+                                 self.start.date(), data={'steps': 2})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_forecast_is_cached_until_the_input_window_changes(self):
+        first = self.forecast()
+        self.assertEqual([point['predicted_glucose'] for point in first['forecast']], [116.0, 117.0])
+        self.assertEqual(first['forecast'][0]['time'], (self.start + timedelta(hours=16)).isoformat())
+        self.assertEqual(self.forecast(), first)
+        self.assertEqual(self.predictor.forecast_horizon.call_count, 1)
+
+        # A backdated reading enters the window without becoming the newest one
+        BloodGlucose.objects.create(user=self.user, blood_glucose=300, time_of_measurement='Random',
+                                    severity='High', created_at=self.start + timedelta(hours=14, minutes=30))
+        second = self.forecast()
+        self.assertEqual(self.predictor.forecast_horizon.call_count, 2)
+        self.assertEqual(second['based_on'], first['based_on'])
+        self.assertIn(300, self.predictor.forecast_horizon.call_args.args[0])
+
+
+class LatestForecastTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='latest@example.com', password='pass1234', first_name='L', last_name='F'
+        )
+        self.moment = datetime(2026, 10, 16, 8, tzinfo=dt_timezone.utc)
+
+    def latest(self):
+        return call_view(LatestForecastAPIView, 'get', self.user, ZoneInfo('Africa/Cairo'), self.moment.date())
+
+    def test_latest_of_readings_with_the_same_time_is_the_last_saved(self):
+        first, second = BloodGlucose.objects.bulk_create([
+            BloodGlucose(user=self.user, blood_glucose=value, time_of_measurement='Random', severity='Normal',
+                         predicted_glucose=predicted, created_at=self.moment)
+            for value, predicted in ((110, 105.0), (120, None))
+        ])
+        response = self.latest()
+        self.assertEqual(response.data['measurement_id'], second.id)
+        self.assertEqual(response.data['prediction_status'], 'pending')
+        self.assertEqual(response.data['created_at'], '2026-10-16T11:00:00+03:00')
+
+        BloodGlucose.objects.filter(pk=second.pk).update(predicted_glucose=118.5)
+        self.assertEqual(self.latest().data['predicted_glucose'], 118.5)
+        self.assertEqual(self.latest().data['prediction_status'], 'ready')
+
+
+class AllMeasurementsTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='history@example.com', password='pass1234', first_name='H', last_name='M'
+        )
+        self.user_tz = ZoneInfo('America/New_York')
+        # 22:00 and 23:30 local on Oct 15, then 01:00 local on Oct 16
+        self.readings = BloodGlucose.objects.bulk_create([
+            BloodGlucose(user=self.user, blood_glucose=100 + i, time_of_measurement='Random', severity='Normal',
+                         created_at=datetime(2026, 10, 16, hour, minute, tzinfo=dt_timezone.utc))
+            for i, (hour, minute) in enumerate(((2, 0), (3, 30), (5, 0)))
+        ])
+
+    def history(self, **params):
+        response = call_view(AllMeasurementsAPIView, 'get', self.user, self.user_tz, datetime(2026, 10, 16).date(),
+                             data=params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_plain_list_filtered_by_local_dates(self):
+        data = self.history(**{'from': '2026-10-15', 'to': '2026-10-15'})
+        self.assertEqual([row['id'] for row in data], [self.readings[1].id, self.readings[0].id])
+        self.assertEqual(data[0]['created_at'], '2026-10-15T23:30:00-04:00')
+
+    def test_cursor_pagination_is_opt_in(self):
+        page = self.history(page_size=2)
+        self.assertEqual([row['id'] for row in page['results']], [self.readings[2].id, self.readings[1].id])
+        self.assertIsNotNone(page['next'])
+        self.assertEqual(page['results'][0]['created_at'], '2026-10-16T01:00:00-04:00')
+
+
+class GlucoseStatisticsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email='statistics@example.com', password='pass1234', first_name='S', last_name='T'
+        )
+        self.user_tz = ZoneInfo('Asia/Tokyo')
+        readings = [
+            (datetime(2026, 10, 15, 12, 0), 90, 'Normal'),    # Oct 15 21:00 in Tokyo, outside the range
+            (datetime(2026, 10, 15, 23, 30), 100, 'Normal'),  # Oct 16 08:30
+            (datetime(2026, 10, 16, 14, 0), 140, 'High'),     # Oct 16 23:00
+            (datetime(2026, 10, 16, 16, 0), 200, 'High'),     # Oct 17 01:00
+        ]
+        for moment, value, severity in readings:
+            self.add(moment, value, severity)
+
+    def add(self, moment, value, severity):
+        BloodGlucose.objects.create(user=self.user, blood_glucose=value, time_of_measurement='Random',
+                                    severity=severity, created_at=moment.replace(tzinfo=dt_timezone.utc))
+
+    def statistics(self):
+        response = call_view(GlucoseStatisticsAPIView, 'get', self.user, self.user_tz, datetime(2026, 10, 17).date(),
+                             data={'from': '2026-10-16', 'to': '2026-10-17'})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_buckets_follow_the_users_local_days(self):
+        data = self.statistics()
+        self.assertEqual(data['overall']['count'], 3)
+        self.assertEqual(data['overall']['mean'], round(440 / 3, 1))
+        self.assertEqual(data['estimated_a1c'], round((440 / 3 + 46.7) / 28.7, 2))
+        self.assertEqual(data['time_in_range'], {'Normal': 33.3, 'High': 66.7})
+        self.assertEqual(
+            [(row['period'], row['count'], row['mean'], row['std']) for row in data['daily']],
+            [('2026-10-16', 2, 120.0, 20.0), ('2026-10-17', 1, 200.0, 0.0)],
+        )
+        self.assertEqual([(row['period'], row['count']) for row in data['weekly']], [('2026-10-12', 3)])
+        self.assertEqual([(row['period'], row['count']) for row in data['monthly']], [('2026-10-01', 3)])
+
+    def test_new_reading_invalidates_the_cached_statistics(self):
+        self.assertEqual(self.statistics()['overall']['count'], 3)
+        self.add(datetime(2026, 10, 16, 0, 0), 120, 'Normal')
+        self.assertEqual(self.statistics()['overall']['count'], 4)
@@ -1,10 +1,15 @@
 # glucose/urls.py
 
 from django.urls import path
-from .views import Last16MeasurementsAPIView, AllMeasurementsAPIView, AddMeasurementAPIView
+from .views import Last16MeasurementsAPIView, AllMeasurementsAPIView, AddMeasurementAPIView, LatestForecastAPIView, ForecastHorizonAPIView, GlucoseStatisticsAPIView, ImportMeasurementsAPIView, CGMReadingsAPIView
 app_name = 'diabetis'
 urlpatterns = [
     path('history/last16/', Last16MeasurementsAPIView.as_view(), name='last-16-measurements'),
     path('history/all/', AllMeasurementsAPIView.as_view(), name='all-measurements'),
     path('add/', AddMeasurementAPIView.as_view(), name='add-measurement'),
+    path('forecast/latest/', LatestForecastAPIView.as_view(), name='latest-forecast'),
+    path('forecast/', ForecastHorizonAPIView.as_view(), name='forecast-horizon'),
+    path('import/', ImportMeasurementsAPIView.as_view(), name='import-measurements'),
+    path('cgm/', CGMReadingsAPIView.as_view(), name='cgm-readings'),
+    path('statistics/', GlucoseStatisticsAPIView.as_view(), name='statistics'),
 ]
@@ -1,3 +1,5 @@
+import numpy as np
+
 THRESHOLDS = {
     "Pre-Breakfast": [(200, 'Dangerous'), (130, 'High'), (90, 'Normal'), (70, 'Low')],
     "Post-Breakfast": [(220, 'Dangerous'), (140, 'High'), (90, 'Normal'), (80, 'Low')],
@@ -14,3 +16,40 @@ def classify_glucose(value, time_of_day):
         if value >= threshold:
             return label
     return 'Very Low'
+
+
+
+# Array form of THRESHOLDS: one row of ascending bounds per time of measurement,
+# indexing SEVERITY_LABELS (every table shares the same label order).
+SEVERITY_LABELS = np.array(['Very Low', 'Low', 'Normal', 'High', 'Dangerous'], dtype=object)
+TIME_CODES = {time_of_day: code for code, time_of_day in enumerate(THRESHOLDS)}
+RANDOM_CODE = TIME_CODES["Random"]
+THRESHOLD_BOUNDS = np.array([
+    [threshold for threshold, _ in reversed(thresholds)] for thresholds in THRESHOLDS.values()
+], dtype=np.float64)
+
+
+def time_codes(times_of_day):
+    """Map time-of-measurement labels to TIME_CODES, unknown labels to Random."""
+    return np.array([TIME_CODES.get(time_of_day, RANDOM_CODE) for time_of_day in times_of_day], dtype=np.intp)
+
+
+def classify_glucose_codes(values, codes):
+    """Severity indexes into SEVERITY_LABELS for arrays of values and time codes.
+
+    Agrees with classify_glucose: a value equal to a threshold gets that
+    threshold's label and NaN is 'Very Low'.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    codes = np.asarray(codes, dtype=np.intp)
+    severities = np.zeros(values.shape, dtype=np.intp)
+    for code in np.unique(codes):
+        rows = codes == code
+        severities[rows] = np.searchsorted(THRESHOLD_BOUNDS[code], values[rows], side='right')
+    severities[np.isnan(values)] = 0
+    return severities
+
+
+def classify_glucose_array(values, times_of_day):
+    """Vectorized classify_glucose over arrays of values and time-of-measurement labels."""
+    return SEVERITY_LABELS[classify_glucose_codes(values, time_codes(times_of_day))]
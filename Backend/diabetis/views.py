@@ -4,18 +4,25 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
-from .models import BloodGlucose
+from rest_framework.parsers import MultiPartParser
+from .models import BloodGlucose, GlucoseForecast
 from .serializers import BloodGlucoseSerializer
+from .pagination import BloodGlucoseCursorPagination
+from .importer import import_readings
+from . import cgm
+from accounts.middleware import local_day_bounds, make_local
 from .utils import classify_glucose
+from .predictor import schedule_prediction, GlucosePredictor, SEQUENCE_LENGTH
+from django.core.cache import cache
+from django.db.models import Avg, Count, Max, Min, Sum, F
+from django.db.models.functions import TruncDay, TruncWeek, TruncMonth
+from datetime import datetime, timedelta
+import hashlib
+import math
 import numpy as np
-import joblib
-from tensorflow.keras.models import load_model
 from django.utils.dateparse import parse_datetime
 from django.utils import timezone
 
-MODEL_PATH = r"C:\Users\moham\OneDrive\Desktop\Git Uploads\Balance-sugar\Backend\diabetis\resourses\gru_model.keras"
-SCALER_PATH = r"C:\Users\moham\OneDrive\Desktop\Git Uploads\Balance-sugar\Backend\diabetis\resourses\scaler.pkl"
-
 # glucose/views.py (imports remain unchanged)
 
 class Last16MeasurementsAPIView(APIView):
@@ -23,7 +30,7 @@ class Last16MeasurementsAPIView(APIView):
 
     def get(self, request):
         user_tz = request.user_timezone
-        measurements = BloodGlucose.objects.filter(user=request.user).order_by('-created_at')[:16][::-1]
+        measurements = BloodGlucose.objects.filter(user=request.user).order_by('-created_at', '-id')[:16][::-1]
         serializer = BloodGlucoseSerializer(measurements, many=True, context={'user_timezone': user_tz})
         return Response(serializer.data)
 
@@ -32,10 +39,23 @@ class AllMeasurementsAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
+        """Measurement history, optionally limited to the local dates `from`..`to`."""
         user_tz = request.user_timezone
-        measurements = BloodGlucose.objects.filter(user=request.user).order_by('-created_at')
-        serializer = BloodGlucoseSerializer(measurements, many=True, context={'user_timezone': user_tz})
-        return Response(serializer.data)
+        try:
+            from_date, to_date = parse_local_dates(request)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        measurements = BloodGlucose.objects.filter(user=request.user)
+        if from_date:
+            measurements = measurements.filter(created_at__gte=local_day_bounds(user_tz, from_date).start)
+        if to_date:
+            measurements = measurements.filter(created_at__lt=local_day_bounds(user_tz, to_date).end)
+
+        return BloodGlucoseCursorPagination().list_response(
+            request, measurements.order_by('-created_at', '-id'),
+            lambda rows: BloodGlucoseSerializer(rows, many=True, context={'user_timezone': user_tz}).data,
+        )
 
 
 
@@ -58,20 +78,7 @@ class AddMeasurementAPIView(APIView):
         # Classify severity
         severity = classify_glucose(blood_glucose, time_of_measurement)
 
-        # Prediction logic
         user = request.user
-        previous_measurements = BloodGlucose.objects.filter(user=user).order_by('-created_at')[:16][::-1]
-
-        if len(previous_measurements) < 16:
-            predicted_glucose = 0.0
-        else:
-            # Scale the last 16 values and predict
-            scaler = joblib.load(SCALER_PATH)
-            model = load_model(MODEL_PATH, compile=False)
-            values = np.array([m.blood_glucose for m in previous_measurements]).reshape(-1, 1)
-            scaled = scaler.transform(values).reshape(1, 16, 1)
-            prediction = model.predict(scaled)[0][0]
-            predicted_glucose = float(scaler.inverse_transform([[prediction]])[0][0])
 
         # Handle datetime override
         if created_at:
@@ -84,14 +91,368 @@ class AddMeasurementAPIView(APIView):
         else:
             created_at = timezone.now()
 
-        # Save to DB
-        BloodGlucose.objects.create(
+        # Save to DB; the forecast is filled in by a background worker
+        measurement = BloodGlucose.objects.create(
             user=user,
             blood_glucose=blood_glucose,
             time_of_measurement=time_of_measurement,
             severity=severity,
-            predicted_glucose=predicted_glucose,
+            predicted_glucose=None,
             created_at=created_at
         )
+        schedule_prediction(measurement.id)
+
+        return Response({
+            "message": "Measurement added successfully.",
+            "id": measurement.id,
+            "prediction_status": "pending",
+        }, status=status.HTTP_201_CREATED)
+
+
+class LatestForecastAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """Forecast attached to the user's latest measurement, or its pending status."""
+        measurement = BloodGlucose.objects.filter(user=request.user).order_by('-created_at', '-id').first()
+        if measurement is None:
+            return Response({"error": "No measurements found."}, status=404)
+
+        if measurement.forecast_skipped:
+            prediction_status = "skipped"
+        else:
+            prediction_status = "pending" if measurement.predicted_glucose is None else "ready"
+        return Response({
+            "measurement_id": measurement.id,
+            "created_at": measurement.created_at.astimezone(request.user_timezone).isoformat(),
+            "predicted_glucose": measurement.predicted_glucose,
+            "prediction_status": prediction_status,
+            # Next-reading forecast from the nightly forecast_glucose job, if it covers this reading
+            "next_reading_forecast": GlucoseForecast.objects.filter(
+                user=request.user, based_on=measurement
+            ).values_list('predicted_glucose', flat=True).first(),
+        })
+
+
+
+class ImportMeasurementsAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request):
+        """Import readings from an uploaded CSV (`file`); timestamps are in the user's timezone."""
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({"error": "file is required."}, status=400)
+
+        try:
+            result = import_readings(request.user, upload, request.user_timezone)
+        except (ValueError, UnicodeDecodeError) as e:
+            return Response({"error": str(e)}, status=400)
+
+        return Response({"message": "Measurements imported successfully.", **result}, status=status.HTTP_201_CREATED)
+
+
+
+# Limits and defaults of the multi-step forecast
+MAX_FORECAST_STEPS = 48
+DEFAULT_FORECAST_STEPS = 8
+# Used when the user has no past predictions to measure the model error against
+DEFAULT_FORECAST_ERROR = 15.0
+
+
+def window_fingerprint(rows):
+    """Stable hash of the forecast input rows (id, value, past prediction and time of each)."""
+    parts = (
+        f"{row['id']}:{row['blood_glucose']}:{row['predicted_glucose']}:{row['created_at'].timestamp()}"
+        for row in rows
+    )
+    return hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()
+
+
+class ForecastHorizonAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """Forecast the next `steps` readings with 95% uncertainty bands.
+
+        Results are cached per (user, input window, steps); the window is
+        fingerprinted row by row, so new, backdated or imported readings
+        invalidate them automatically.
+        """
+        try:
+            steps = int(request.query_params.get('steps', DEFAULT_FORECAST_STEPS))
+        except ValueError:
+            return Response({"error": "steps must be an integer."}, status=400)
+        if not 1 <= steps <= MAX_FORECAST_STEPS:
+            return Response({"error": f"steps must be between 1 and {MAX_FORECAST_STEPS}."}, status=400)
+
+        recent = list(
+            BloodGlucose.objects.filter(user=request.user)
+            .order_by('-created_at', '-id')
+            .values('id', 'blood_glucose', 'predicted_glucose', 'created_at')[:SEQUENCE_LENGTH]
+        )[::-1]
+        if len(recent) < SEQUENCE_LENGTH:
+            return Response({"error": f"At least {SEQUENCE_LENGTH} measurements are required."}, status=400)
+
+        cache_key = f"diabetis:forecast:{request.user.id}:{window_fingerprint(recent)}:{steps}"
+        horizon = cache.get(cache_key)
+        if horizon is None:
+            horizon = self.build_horizon(recent, steps)
+            cache.set(cache_key, horizon, 60 * 60 * 24)
+
+        user_tz = request.user_timezone
+        return Response({
+            "based_on": recent[-1]['id'],
+            "steps": steps,
+            "forecast": [
+                {**point, "time": point["time"].astimezone(user_tz).isoformat()}
+                for point in horizon
+            ],
+        })
+
+    @staticmethod
+    def build_horizon(recent, steps):
+        values = np.array([row['blood_glucose'] for row in recent])
+        forecast = GlucosePredictor.get().forecast_horizon(values, steps)
+
+        # Model error measured on the user's own recent readings, widening with sqrt(step)
+        errors = np.array([
+            row['blood_glucose'] - row['predicted_glucose']
+            for row in recent if row['predicted_glucose']
+        ])
+        sigma = float(errors.std()) if errors.size >= 2 else DEFAULT_FORECAST_ERROR
+        spread = 1.96 * sigma * np.sqrt(np.arange(1, steps + 1))
+
+        # Readings are assumed to continue at the user's average interval
+        seconds = np.diff([row['created_at'].timestamp() for row in recent])
+        interval = timedelta(seconds=float(np.median(seconds))) if seconds.size else timedelta(hours=4)
+        last_time = recent[-1]['created_at']
+
+        return [
+            {
+                "step": step + 1,
+                "time": last_time + interval * (step + 1),
+                "predicted_glucose": round(float(forecast[step]), 1),
+                "lower": round(float(max(forecast[step] - spread[step], 0.0)), 1),
+                "upper": round(float(forecast[step] + spread[step]), 1),
+            }
+            for step in range(steps)
+        ]
+
+
 
-        return Response({"message": "Measurement added successfully."}, status=status.HTTP_201_CREATED)
+def parse_local_dates(request):
+    """The `from`/`to` query parameters (YYYY-MM-DD) as dates, None where absent.
+
+    Raises ValueError on bad input.
+    """
+    raw_from = request.query_params.get('from')
+    raw_to = request.query_params.get('to')
+    try:
+        from_date = datetime.strptime(raw_from, '%Y-%m-%d').date() if raw_from else None
+        to_date = datetime.strptime(raw_to, '%Y-%m-%d').date() if raw_to else None
+    except ValueError:
+        raise ValueError("Use YYYY-MM-DD for from/to.")
+    if from_date and to_date and from_date > to_date:
+        raise ValueError("from must not be after to.")
+    return from_date, to_date
+
+
+def local_date_range(request, default_days=90):
+    """UTC bounds of the local dates in the `from`/`to` query parameters (`to` inclusive).
+
+    Defaults to the last `default_days` days. Raises ValueError on bad input.
+    """
+    user_tz = request.user_timezone
+    from_date, to_date = parse_local_dates(request)
+    to_date = to_date or request.local_day.date
+    from_date = from_date or to_date - timedelta(days=default_days - 1)
+    if from_date > to_date:
+        raise ValueError("from must not be after to.")
+    return from_date, to_date, local_day_bounds(user_tz, from_date).start, local_day_bounds(user_tz, to_date).end
+
+
+def estimated_a1c(mean_glucose):
+    """ADAG estimate of HbA1c (%) from mean glucose in mg/dL."""
+    return round((mean_glucose + 46.7) / 28.7, 2)
+
+
+def summarize(row):
+    """mean/min/max/std of an aggregate row with count, mean, min, max and sum_sq."""
+    count = row['count']
+    mean = row['mean']
+    variance = max(row['sum_sq'] / count - mean * mean, 0.0) if count else 0.0
+    return {
+        'count': count,
+        'mean': round(mean, 1) if mean is not None else None,
+        'min': row['min'],
+        'max': row['max'],
+        'std': round(math.sqrt(variance), 1) if count else None,
+    }
+
+
+GLUCOSE_AGGREGATES = {
+    'count': Count('id'),
+    'mean': Avg('blood_glucose'),
+    'min': Min('blood_glucose'),
+    'max': Max('blood_glucose'),
+    'sum_sq': Sum(F('blood_glucose') * F('blood_glucose')),
+}
+
+
+class GlucoseStatisticsAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """Aggregated glucose statistics over a local date range.
+
+        Everything is aggregated in the database (the standard deviation comes
+        from the sum of squares) and the response is cached until the user
+        adds a reading.
+        """
+        try:
+            from_date, to_date, start, end = local_date_range(request)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+
+        measurements = BloodGlucose.objects.filter(user=request.user, created_at__gte=start, created_at__lt=end)
+        latest_id = BloodGlucose.objects.filter(user=request.user).order_by('-id').values_list('id', flat=True).first()
+        user_tz = request.user_timezone
+        cache_key = f"diabetis:statistics:{request.user.id}:{latest_id}:{from_date}:{to_date}:{user_tz}"
+        data = cache.get(cache_key)
+        if data is not None:
+            return Response(data)
+
+        overall = summarize(measurements.aggregate(**GLUCOSE_AGGREGATES))
+
+        buckets = {}
+        for name, trunc in (('daily', TruncDay), ('weekly', TruncWeek), ('monthly', TruncMonth)):
+            rows = (
+                measurements
+                .annotate(period=trunc('created_at', tzinfo=user_tz))
+                .values('period')
+                .annotate(**GLUCOSE_AGGREGATES)
+                .order_by('period')
+            )
+            buckets[name] = [{'period': row['period'].date().isoformat(), **summarize(row)} for row in rows]
+
+        severity_counts = dict(measurements.values_list('severity').annotate(Count('id')).order_by())
+        total = overall['count']
+        time_in_range = {
+            severity: round(count * 100.0 / total, 1) for severity, count in severity_counts.items()
+        } if total else {}
+
+        by_time_of_measurement = {
+            row['time_of_measurement']: summarize(row)
+            for row in measurements.values('time_of_measurement').annotate(**GLUCOSE_AGGREGATES).order_by()
+        }
+
+        data = {
+            'from': from_date.isoformat(),
+            'to': to_date.isoformat(),
+            'overall': overall,
+            'estimated_a1c': estimated_a1c(overall['mean']) if total else None,
+            'time_in_range': time_in_range,
+            'by_time_of_measurement': by_time_of_measurement,
+            **buckets,
+        }
+        cache.set(cache_key, data, 60 * 60 * 24)
+        return Response(data)
+
+
+
+# Largest CGM upload accepted in one request (about a month at 5-minute intervals)
+MAX_CGM_BATCH = 10000
+# Longest range and largest number of chart points a CGM query may return
+MAX_CGM_DAYS = 90
+MAX_CGM_POINTS = 2000
+
+
+def parse_reading_time(value, user_tz):
+    """Aware datetime of an uploaded ISO time; times without an offset are local to `user_tz`."""
+    moment = parse_datetime(str(value))
+    if moment is None:
+        raise ValueError
+    if timezone.is_naive(moment):
+        moment = make_local(user_tz, moment)
+    return moment
+
+
+class CGMReadingsAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        """Upload a batch of CGM readings.
+
+        Either {"readings": [{"time": ISO datetime, "value": mg/dL}, ...]} or the
+        compact {"start": ISO datetime, "interval": seconds, "values": [...]}.
+        Times without a UTC offset are read in the user's timezone.
+        """
+        user_tz = request.user_timezone
+        try:
+            if 'values' in request.data:
+                start = parse_reading_time(request.data.get('start', ''), user_tz)
+                interval = int(request.data.get('interval', 300))
+                values = np.array([float(value) for value in request.data['values']])
+                if interval <= 0:
+                    raise ValueError
+                timestamps = int(start.timestamp()) + interval * np.arange(len(values))
+            else:
+                readings = request.data.get('readings') or []
+                timestamps = [int(parse_reading_time(reading['time'], user_tz).timestamp()) for reading in readings]
+                values = np.array([float(reading['value']) for reading in readings])
+        except (KeyError, TypeError, ValueError):
+            return Response({"error": "Send readings as [{time, value}] or start, interval and values."}, status=400)
+
+        if not len(values):
+            return Response({"error": "No readings given."}, status=400)
+        if len(values) > MAX_CGM_BATCH:
+            return Response({"error": f"At most {MAX_CGM_BATCH} readings per request."}, status=400)
+        if not np.isfinite(values).all():
+            return Response({"error": "Reading values must be finite numbers."}, status=400)
+
+        days = cgm.ingest_readings(request.user, timestamps, values)
+        return Response({"message": "Readings stored.", "readings": len(values), "days": days}, status=status.HTTP_201_CREATED)
+
+    def get(self, request):
+        """CGM readings between the local dates `from`..`to`, downsampled for charts.
+
+        `resolution` is one of 5m, 15m, 1h, 4h, 1d; by default the smallest one
+        giving at most 300 points is used. Ranges are limited to MAX_CGM_DAYS
+        days and MAX_CGM_POINTS points.
+        """
+        try:
+            from_date, to_date, start, end = local_date_range(request, default_days=1)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+        if (to_date - from_date).days >= MAX_CGM_DAYS:
+            return Response({"error": f"The range must not exceed {MAX_CGM_DAYS} days."}, status=400)
+
+        resolution = request.query_params.get('resolution') or cgm.pick_resolution(start, end)
+        if resolution not in cgm.RESOLUTIONS:
+            return Response({"error": f"resolution must be one of {', '.join(cgm.RESOLUTIONS)}."}, status=400)
+        if (end - start).total_seconds() / cgm.RESOLUTIONS[resolution] > MAX_CGM_POINTS:
+            return Response({"error": f"Use a coarser resolution; at most {MAX_CGM_POINTS} points per request."}, status=400)
+
+        timestamps, values = cgm.load_readings(request.user, start, end)
+        # Buckets are aligned to the user's local midnight of `from`
+        starts, means, minimums, maximums, counts = cgm.downsample(
+            timestamps, values, cgm.RESOLUTIONS[resolution], origin=int(start.timestamp())
+        )
+        user_tz = request.user_timezone
+        return Response({
+            "from": from_date.isoformat(),
+            "to": to_date.isoformat(),
+            "resolution": resolution,
+            "points": [
+                {
+                    "time": cgm.to_datetime(bucket_start).astimezone(user_tz).isoformat(),
+                    "mean": round(float(mean), 1),
+                    "min": float(minimum),
+                    "max": float(maximum),
+                    "count": int(count),
+                }
+                for bucket_start, mean, minimum, maximum, count in zip(starts, means, minimums, maximums, counts)
+            ],
+        })
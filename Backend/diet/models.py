@@ -4,11 +4,11 @@ from django.db.models.signals import post_save , post_delete
 from django.http import response
 from django.utils import timezone
 from accounts.models import User , Profile
+from accounts.middleware import local_day_bounds, resolve_timezone
 from decimal import Decimal
 import os 
 from django.conf import settings
 import csv
-from datetime import datetime, time
 import pytz
 
 class DailySummary(models.Model):
@@ -37,23 +37,16 @@ class DailySummary(models.Model):
         if user_timezone is None:
             user_timezone = pytz.UTC
         elif isinstance(user_timezone, str):
-            user_timezone = pytz.timezone(user_timezone)
+            user_timezone = resolve_timezone(user_timezone)
 
-        # Build UTC range for user's local calendar day
-        start_local = datetime.combine(self.date, time.min)
-        end_local = datetime.combine(self.date, time.max)
-
-        start_aware = timezone.make_aware(start_local, user_timezone)
-        end_aware = timezone.make_aware(end_local, user_timezone)
-
-        start_utc = start_aware.astimezone(pytz.UTC)
-        end_utc = end_aware.astimezone(pytz.UTC)
+        # UTC range of the user's local calendar day
+        _, start_utc, end_utc = local_day_bounds(user_timezone, self.date)
 
         # Meals created within this local day (converted to UTC)
         meals = Meal.objects.filter(
             user=self.user,
             created_at__gte=start_utc,
-            created_at__lte=end_utc
+            created_at__lt=end_utc
         )
 
         self.total_calories_consumed = sum([meal.calories for meal in meals])
@@ -357,14 +350,20 @@ class Meal(models.Model):
 def create_or_update_calorie_goals(sender, instance, created, **kwargs):
     """
     Automatically create or update Calorie Goals when Profile has enough information.
+    Only runs when one of the fields the goals depend on changed.
     """
-    user = instance.user
+    if not instance.goal_fields_changed:
+        return
 
     # Check if weight, height, age, and gender are filled
     if all([instance.weight, instance.height, instance.age, instance.gender]):
-        # Create or update Calorie Goals
+        # Create or update Calorie Goals; creating already calculates them in save()
+        user = instance.user
         calorie_goals, created = CalorieGoals.objects.get_or_create(user=user)
-        calorie_goals.save()  # This will auto-recalculate using your save() method
+        if not created:
+            # Reuse the saved profile instead of reloading user and profile
+            calorie_goals.user = user
+            calorie_goals.save()
 
 
 
@@ -11,8 +11,6 @@ from .models import Food, Meal , StepHistory, DailySummary , CalorieGoals , Cumu
 from .serializers import FoodSerializer, MealSerializer , StepHistorySerializer, DailySummarySerializer
 from datetime import date, timedelta
 from drf_yasg import openapi
-import pytz
-from django.utils.timezone import localtime
 
 
 # 1- Retrieve a list of all available meal types
@@ -90,19 +88,9 @@ def create_meal(request):
 def get_meal_list(request):
     """Retrieve all meals for the authenticated user, grouped by meal type for today."""
 
-    user_tz = request.headers.get("User-Timezone", "UTC")
-    user_timezone = pytz.timezone(user_tz)
-
-    # Get user’s today date in their local timezone
-    user_now = timezone.now().astimezone(user_timezone)
-    user_today = user_now.date()
-
-    # Retrieve objects and filter by local date
-    meals = Meal.objects.filter(user=request.user)
-    meals = [
-        meal for meal in meals
-        if localtime(meal.created_at, user_timezone).date() == user_today
-        ]
+    # Meals created during the user's local today
+    local_day = request.local_day
+    meals = Meal.objects.filter(user=request.user, created_at__gte=local_day.start, created_at__lt=local_day.end)
     meal_groups = {
         "breakfast": [],
         "lunch": [],
@@ -274,7 +262,7 @@ def record_cumulative_steps(request):
     - Next day: baseline = last_cumulative_value from previous day
     """
     user = request.user
-    user_today = timezone.now().astimezone(request.user_timezone).date()
+    user_today = request.local_day.date
     data = request.data
     
     # Validate input
@@ -371,7 +359,7 @@ def record_cumulative_steps(request):
 def get_today_step_record(request): 
     """Get the current day's step record with additional context."""
     user = request.user
-    user_today = timezone.now().astimezone(request.user_timezone).date()
+    user_today = request.local_day.date
 
     try:
         step_history = StepHistory.objects.get(user=user, date=user_today)
@@ -408,7 +396,7 @@ def get_today_step_record(request):
 def get_daily_summary(request):
     user = request.user
     user_tz = request.user_timezone
-    user_today = timezone.now().astimezone(user_tz).date()
+    user_today = request.local_day.date
 
     summary, created = DailySummary.objects.get_or_create(user=user, date=user_today)
     summary.save(user_timezone=user_tz)  # ✅ pass timezone only here
@@ -424,7 +412,7 @@ def nutrition_summary(request):
     """Get today's complete nutrition summary including all macros and their goals."""
     user = request.user
     user_tz = request.user_timezone
-    user_today = timezone.now().astimezone(user_tz).date()
+    user_today = request.local_day.date
 
     # Get or create daily summary
     daily_summary, created = DailySummary.objects.get_or_create(user=user, date=user_today)
@@ -524,7 +512,7 @@ def calculate_nutrition_by_portion(request):
 def calorie_summary(request):
     user = request.user
     user_tz = request.user_timezone
-    user_today = timezone.now().astimezone(user_tz).date()
+    user_today = request.local_day.date
 
     daily_summary , created = DailySummary.objects.get_or_create(user=user, date=user_today)
     # Recalculate with user timezone to ensure correct meal filtering
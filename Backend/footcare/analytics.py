@@ -0,0 +1,77 @@
+import numpy as np
+
+# Windows (days) for the percent-change columns of the healing trend
+TREND_WINDOWS = (7, 30, 90)
+# A diabetic foot ulcer that shrinks by less than ~50% in four weeks is considered non-healing
+STALLED_WINDOW = 30
+STALLED_REDUCTION_PERCENT = 50.0
+
+
+def compute_healing_trends(regions, timestamps, areas):
+    """Per-region healing statistics for a batch of ulcer measurements.
+
+    ``regions``, ``timestamps`` (seconds since epoch) and ``areas`` are parallel
+    sequences sorted by (region, timestamp). All regions are processed together
+    with grouped NumPy reductions; the result maps each region to its index range
+    in the input, a least-squares healing rate (area change per day, negative
+    when shrinking), the percent change over each of TREND_WINDOWS days and a
+    ``stalled`` flag.
+    """
+    regions = np.asarray(regions)
+    days = np.asarray(timestamps, dtype=np.float64) / 86400.0
+    areas = np.asarray(areas, dtype=np.float64)
+    if regions.size == 0:
+        return {}
+
+    # Group boundaries (input is already sorted by region)
+    starts = np.flatnonzero(np.r_[True, regions[1:] != regions[:-1]])
+    ends = np.r_[starts[1:], regions.size]
+    counts = ends - starts
+    group = np.repeat(np.arange(starts.size), counts)
+
+    # Least-squares slope per group, centred on each group's first sample for precision
+    x = days - days[starts][group]
+    sum_x = np.bincount(group, weights=x)
+    sum_y = np.bincount(group, weights=areas)
+    sum_xx = np.bincount(group, weights=x * x)
+    sum_xy = np.bincount(group, weights=x * areas)
+    denominator = counts * sum_xx - sum_x ** 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slopes = np.where(denominator > 0, (counts * sum_xy - sum_x * sum_y) / denominator, np.nan)
+
+    # Percent change between the latest reading and the latest reading at least `window` days older.
+    # Searching on a (group, day) composite key keeps the lookup inside each region.
+    last = ends - 1
+    span = days.max() - days.min() + max(TREND_WINDOWS) + 1
+    keys = group * span + (days - days.min())
+    percent_changes = {}
+    for window in TREND_WINDOWS:
+        targets = np.arange(starts.size) * span + (days[last] - days.min() - window)
+        baseline = np.searchsorted(keys, targets, side='right') - 1
+        valid = (baseline >= starts) & (areas[np.maximum(baseline, 0)] > 0)
+        baseline_area = areas[np.maximum(baseline, 0)]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            change = (areas[last] - baseline_area) / baseline_area * 100.0
+        percent_changes[window] = np.where(valid, change, np.nan)
+
+    stalled_change = percent_changes[STALLED_WINDOW]
+    stalled = np.where(
+        np.isnan(stalled_change),
+        (counts >= 2) & (np.nan_to_num(slopes, nan=-1.0) >= 0),
+        stalled_change > -STALLED_REDUCTION_PERCENT,
+    )
+
+    def _value(number):
+        return None if np.isnan(number) else round(float(number), 4)
+
+    return {
+        str(regions[start]): {
+            'start': int(start),
+            'end': int(end),
+            'count': int(count),
+            'healing_rate': _value(slope),
+            'percent_change': {f'{window}d': _value(percent_changes[window][i]) for window in TREND_WINDOWS},
+            'stalled': bool(stalled[i]),
+        }
+        for i, (start, end, count, slope) in enumerate(zip(starts, ends, counts, slopes))
+    }
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.16 on 2026-10-19 18:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('footcare', '0006_alter_footulcer_region'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='footulcer',
+            name='bounding_box',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='footulcer',
+            name='mask',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='footulcer',
+            name='mask_iou',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='footulcer',
+            name='ulcer_perimeter',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
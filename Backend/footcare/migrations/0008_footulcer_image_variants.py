@@ -0,0 +1,33 @@
+# Generated by Django 4.2.16 on 2026-10-19 18:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('footcare', '0007_footulcer_mask_metrics'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='footulcer',
+            name='image_medium',
+            field=models.ImageField(blank=True, null=True, upload_to='uploads/resized/'),
+        ),
+        migrations.AddField(
+            model_name='footulcer',
+            name='image_thumbnail',
+            field=models.ImageField(blank=True, null=True, upload_to='uploads/resized/'),
+        ),
+        migrations.AddField(
+            model_name='footulcer',
+            name='segmented_medium',
+            field=models.ImageField(blank=True, null=True, upload_to='uploads/resized/'),
+        ),
+        migrations.AddField(
+            model_name='footulcer',
+            name='segmented_thumbnail',
+            field=models.ImageField(blank=True, null=True, upload_to='uploads/resized/'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.16 on 2026-10-19 18:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('footcare', '0008_footulcer_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='footulcer',
+            index=models.Index(fields=['user', 'region', 'id'], name='footulcer_user_region_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='footulcer',
+            index=models.Index(fields=['user', 'uploaded_at', 'id'], name='footulcer_user_uploaded_idx'),
+        ),
+    ]
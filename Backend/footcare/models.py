@@ -10,10 +10,24 @@ class FootUlcer(models.Model):
     confidence = models.FloatField(null=True, blank=True)
     region = models.CharField(max_length=50 ,  null = False , blank= False)
     segmented_image = models.ImageField(upload_to="uploads/segmented/", null=True, blank=True)
+    image_thumbnail = models.ImageField(upload_to="uploads/resized/", null=True, blank=True)
+    image_medium = models.ImageField(upload_to="uploads/resized/", null=True, blank=True)
+    segmented_thumbnail = models.ImageField(upload_to="uploads/resized/", null=True, blank=True)
+    segmented_medium = models.ImageField(upload_to="uploads/resized/", null=True, blank=True)
     ulcer_area = models.FloatField(null=True, blank=True)
     last_area = models.FloatField(null=True, blank=True)
     area_difference = models.FloatField(null=True, blank=True)
     improvement_message = models.CharField(max_length=255, null=True, blank=True)
+    mask = models.BinaryField(null=True, blank=True, editable=False)  # 224x224 mask, bit-packed
+    ulcer_perimeter = models.FloatField(null=True, blank=True)
+    bounding_box = models.JSONField(null=True, blank=True)
+    mask_iou = models.FloatField(null=True, blank=True)  # overlap with the previous mask of the same region
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'region', 'id'], name='footulcer_user_region_id_idx'),
+            models.Index(fields=['user', 'uploaded_at', 'id'], name='footulcer_user_uploaded_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.email} - {self.classification_result}"
@@ -0,0 +1,8 @@
+from project.pagination import OptInCursorPagination
+
+
+class FootUlcerCursorPagination(OptInCursorPagination):
+    """Newest-first cursor pagination over (uploaded_at, id)."""
+    page_size = 20
+    max_page_size = 100
+    ordering = ('-uploaded_at', '-id')
@@ -1,4 +1,3 @@
-
 from rest_framework import serializers
 from .models import FootUlcer
 from django.conf import settings
@@ -7,20 +6,50 @@ from django.conf import settings
 class FootUlcerSerializer(serializers.ModelSerializer):
     segmented_image_url = serializers.SerializerMethodField()
     image_url = serializers.SerializerMethodField()
+    thumbnail_url = serializers.SerializerMethodField()
+    medium_url = serializers.SerializerMethodField()
+    segmented_thumbnail_url = serializers.SerializerMethodField()
+    segmented_medium_url = serializers.SerializerMethodField()
     
     class Meta:
         model = FootUlcer
-        fields = ['id', 'user', 'image','region', 'image_url', 'classification_result', 'confidence', 'segmented_image', 'segmented_image_url', 'ulcer_area', 'last_area', 'area_difference', 'improvement_message', 'uploaded_at']
+        fields = ['id', 'user', 'image','region', 'image_url', 'thumbnail_url', 'medium_url', 'classification_result', 'confidence', 'segmented_image', 'segmented_image_url', 'segmented_thumbnail_url', 'segmented_medium_url', 'ulcer_area', 'ulcer_perimeter', 'bounding_box', 'mask_iou', 'last_area', 'area_difference', 'improvement_message', 'uploaded_at']
     
-    def get_image_url(self, obj):
+    def __init__(self, *args, **kwargs):
+        # Optional subset of fields, e.g. FootUlcerSerializer(qs, many=True, fields=['ulcer_area', 'uploaded_at'])
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
+
+    def _file_url(self, file):
+        if not file:
+            return None
+        url = file.url
         request = self.context.get('request')
-        if obj.image:
-            return request.build_absolute_uri(obj.image.url) if request else obj.image.url
-        return None
+        if not request or not url.startswith('/'):
+            return url
+        # Resolve scheme and host once per serialization instead of once per file
+        base_url = self.context.get('_base_url')
+        if base_url is None:
+            base_url = self.context['_base_url'] = request.build_absolute_uri('/').rstrip('/')
+        return base_url + url
+
+    def get_image_url(self, obj):
+        return self._file_url(obj.image)
 
     def get_segmented_image_url(self, obj):
-        request = self.context.get('request')
-        if obj.segmented_image:
-            return request.build_absolute_uri(obj.segmented_image.url) if request else obj.segmented_image.url
-        return None
+        return self._file_url(obj.segmented_image)
+
+    def get_thumbnail_url(self, obj):
+        return self._file_url(obj.image_thumbnail)
+
+    def get_medium_url(self, obj):
+        return self._file_url(obj.image_medium)
+
+    def get_segmented_thumbnail_url(self, obj):
+        return self._file_url(obj.segmented_thumbnail)
 
+    def get_segmented_medium_url(self, obj):
+        return self._file_url(obj.segmented_medium)
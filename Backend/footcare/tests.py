@@ -1,7 +1,8 @@
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase
 from django.core.files.uploadedfile import SimpleUploadedFile
 from rest_framework.test import APIClient
 from django.contrib.auth import get_user_model
+from .models import FootUlcer
 
 class FootUlcerAPITest(TestCase):
     def setUp(self):
@@ -17,4 +18,89 @@ class FootUlcerAPITest(TestCase):
             format='multipart'
         )
         self.assertEqual(response.status_code, 201)
-        self.assertIn('segmented_image_url', response.data)
\ No newline at end of file
+        self.assertIn('segmented_image_url', response.data)
+
+class FootUlcerHistoryTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='history@example.com', password='password123', first_name='F', last_name='U'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.ulcers = [
+            FootUlcer.objects.create(user=self.user, image=f'uploads/ulcer{i}.jpg', region='Left Foot', ulcer_area=10.0 * i)
+            for i in range(3)
+        ]
+
+    def test_plain_list_without_pagination_parameters(self):
+        response = self.client.get('/footcare/ulcers/', {'fields': 'id,ulcer_area'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            sorted((row['id'], row['ulcer_area']) for row in response.data),
+            [(ulcer.id, ulcer.ulcer_area) for ulcer in self.ulcers],
+        )
+        self.assertEqual(set(response.data[0]), {'id', 'ulcer_area'})
+
+    def test_cursor_pages_are_newest_first(self):
+        response = self.client.get('/footcare/ulcers/', {'page_size': 2, 'fields': 'id'})
+        self.assertEqual([row['id'] for row in response.data['results']], [self.ulcers[2].id, self.ulcers[1].id])
+        self.assertIsNotNone(response.data['next'])
+
+        response = self.client.get(response.data['next'])
+        self.assertEqual([row['id'] for row in response.data['results']], [self.ulcers[0].id])
+        self.assertIsNone(response.data['next'])
+
+
+class MaskMetricsTest(SimpleTestCase):
+    def test_metrics_are_scaled_to_original_image(self):
+        import numpy as np
+        from .utils import calculate_mask_metrics, pack_mask, unpack_mask, mask_iou
+
+        mask = np.zeros((224, 224), dtype=np.uint8)
+        mask[10:20, 30:50] = 1
+
+        self.assertTrue((unpack_mask(pack_mask(mask)) == mask).all())
+        metrics = calculate_mask_metrics(mask, (448, 224))
+        self.assertEqual(metrics['area'], 400.0)
+        self.assertEqual(metrics['perimeter'], 80.0)
+        self.assertEqual(metrics['bounding_box'], {'x': 30.0, 'y': 20.0, 'width': 20.0, 'height': 20.0})
+        self.assertEqual(mask_iou(mask, mask), 1.0)
+
+
+class ImageVariantsTest(SimpleTestCase):
+    def test_variants_are_downscaled_webp_copies(self):
+        import cv2
+        import numpy as np
+        from .utils import build_image_variants
+
+        image = np.zeros((1000, 2000, 3), dtype=np.uint8)
+        image[:, :1000] = (255, 0, 0)
+        variants = build_image_variants(image)
+        self.assertEqual(set(variants), {'thumbnail', 'medium'})
+        for name, size in (('thumbnail', (128, 256)), ('medium', (512, 1024))):
+            self.assertTrue(variants[name].startswith(b'RIFF'))
+            decoded = cv2.imdecode(np.frombuffer(variants[name], dtype=np.uint8), cv2.IMREAD_COLOR)
+            self.assertEqual(decoded.shape[:2], size)
+
+    def test_small_images_are_not_upscaled(self):
+        import numpy as np
+        from .utils import resize_max_side
+
+        image = np.zeros((50, 100, 3), dtype=np.uint8)
+        self.assertIs(resize_max_side(image, 256), image)
+
+
+class HealingTrendTest(SimpleTestCase):
+    def test_trends_are_computed_per_region(self):
+        from .analytics import compute_healing_trends
+
+        day = 86400
+        trends = compute_healing_trends(
+            ['Heel', 'Heel', 'Heel', 'Toe'],
+            [0, 10 * day, 40 * day, 0],
+            [100, 80, 20, 50],
+        )
+        self.assertEqual(trends['Heel']['healing_rate'], -2.0)
+        self.assertEqual(trends['Heel']['percent_change']['30d'], -75.0)
+        self.assertFalse(trends['Heel']['stalled'])
+        self.assertIsNone(trends['Toe']['healing_rate'])
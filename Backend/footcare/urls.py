@@ -9,6 +9,7 @@ urlpatterns = [
     path('ulcers/create/', views.create_foot_ulcer, name='create-foot-ulcer'),
     path('ulcers/latest_by_region/', views.get_latest_ulcers_per_region, name='get_latest_ulcers_per_region'),
     path('ulcers/ulcers_by_region/', views.get_ulcers_by_region, name='get_ulcers_by_region'),
+    path('ulcers/trends/', views.get_healing_trends, name='get_healing_trends'),
     path('ulcers/delete_ulcers_by_region/' , views.delete_ulcers_by_region , name='delete_ulcers_by_region'),
     path('ulcers/<int:ulcer_id>/update/', views.update_foot_ulcer, name='update_foot_ulcer'),
     path('ulcers/<int:ulcer_id>/delete/', views.delete_foot_ulcer, name='delete_foot_ulcer'),
@@ -27,13 +27,24 @@ def classify_image(img):
         return "Normal (Healthy Skin)", normal_prob
     return "Uncertain", max(normal_prob, ulcer_prob)
 
-def apply_segmentation(img, classification_label): 
-    """Segment ulcer area and color the mask based on classification"""
-    img_resized = cv2.resize(img, (224, 224)) / 255.0
+MASK_SIZE = (224, 224)
+
+def predict_mask(img):
+    """Run the segmentation model and return the binary mask at model resolution (224x224)"""
+    img_resized = cv2.resize(img, MASK_SIZE) / 255.0
     img_resized = np.expand_dims(img_resized, axis=0)
     mask = segmentation_model.predict(img_resized)[0]
     mask = (mask > 0.5).astype(np.uint8)
-    mask = cv2.resize(mask, (img.shape[1], img.shape[0]))
+    return mask.reshape(MASK_SIZE)
+
+def apply_segmentation(img, classification_label): 
+    """Segment ulcer area and color the mask based on classification.
+
+    Returns the overlay image and the binary mask at model resolution; the
+    mask is only upscaled for drawing the overlay.
+    """
+    mask = predict_mask(img)
+    full_mask = cv2.resize(mask, (img.shape[1], img.shape[0]), interpolation=cv2.INTER_NEAREST)
 
     # Color: green for normal, red for ulcer
     if classification_label == "Normal (Healthy Skin)":
@@ -47,14 +58,106 @@ def apply_segmentation(img, classification_label):
 
     overlay = cv2.addWeighted(img, 0.7, color_mask, 0.3, 0)
     result = img.copy()
-    result[mask > 0] = overlay[mask > 0]
+    result[full_mask > 0] = overlay[full_mask > 0]
 
     return result, mask
 
 
-def calculate_ulcer_area(mask, pixel_to_mm_ratio=1.0):
+def pack_mask(mask):
+    """Bit-pack a binary mask into bytes (224x224 -> 6272 bytes)"""
+    return np.packbits(np.asarray(mask) > 0, axis=None).tobytes()
+
+def unpack_mask(data, shape=MASK_SIZE):
+    """Restore a binary mask stored with pack_mask"""
+    bits = np.unpackbits(np.frombuffer(bytes(data), dtype=np.uint8), count=shape[0] * shape[1])
+    return bits.reshape(shape)
+
+def calculate_mask_metrics(mask, image_shape=None, pixel_to_mm_ratio=1.0):
+    """Area, perimeter and bounding box of a low-resolution mask, scaled to the original image.
+
+    ``image_shape`` is the (height, width) of the original image; each mask
+    pixel covers ``sy * sx`` image pixels, so the metrics are scaled
+    analytically instead of being measured on an upscaled mask.
+    ``pixel_to_mm_ratio`` is the area (mm²) of one image pixel.
+    """
+    mask = np.asarray(mask) > 0
+    h, w = mask.shape[:2]
+    if image_shape is None:
+        image_shape = (h, w)
+    sy = image_shape[0] / h
+    sx = image_shape[1] / w
+    linear_ratio = pixel_to_mm_ratio ** 0.5
+
+    area = float(np.count_nonzero(mask)) * sx * sy * pixel_to_mm_ratio
+
+    # Count pixel edges on the mask boundary; vertical edges have length sy, horizontal ones sx
+    padded = np.pad(mask, 1)
+    vertical_edges = np.count_nonzero(padded[:, 1:] != padded[:, :-1])
+    horizontal_edges = np.count_nonzero(padded[1:, :] != padded[:-1, :])
+    perimeter = float(vertical_edges * sy + horizontal_edges * sx) * linear_ratio
+
+    rows = np.flatnonzero(mask.any(axis=1))
+    cols = np.flatnonzero(mask.any(axis=0))
+    if rows.size:
+        bounding_box = {
+            'x': float(cols[0] * sx),
+            'y': float(rows[0] * sy),
+            'width': float((cols[-1] + 1 - cols[0]) * sx),
+            'height': float((rows[-1] + 1 - rows[0]) * sy),
+        }
+    else:
+        bounding_box = None
+
+    return {'area': area, 'perimeter': perimeter, 'bounding_box': bounding_box}
+
+def mask_iou(mask_a, mask_b):
+    """Intersection over union of two masks of the same shape (None if both are empty)"""
+    mask_a = np.asarray(mask_a) > 0
+    mask_b = np.asarray(mask_b) > 0
+    union = np.count_nonzero(mask_a | mask_b)
+    if union == 0:
+        return None
+    return float(np.count_nonzero(mask_a & mask_b)) / union
+
+
+# Longest side (px) of the downscaled copies served to the history screens
+IMAGE_VARIANTS = {
+    'thumbnail': 256,
+    'medium': 1024,
+}
+WEBP_QUALITY = 80
+JPEG_QUALITY = 85
+
+def resize_max_side(img, max_side):
+    """Downscale so the longest side is at most max_side (never upscales)"""
+    h, w = img.shape[:2]
+    scale = max_side / max(h, w)
+    if scale >= 1:
+        return img
+    return cv2.resize(img, (max(1, round(w * scale)), max(1, round(h * scale))), interpolation=cv2.INTER_AREA)
+
+def encode_webp(img, quality=WEBP_QUALITY):
+    """Encode an RGB image as WebP bytes"""
+    ok, buffer = cv2.imencode('.webp', cv2.cvtColor(img, cv2.COLOR_RGB2BGR), [cv2.IMWRITE_WEBP_QUALITY, quality])
+    if not ok:
+        raise ValueError("Could not encode image as WebP")
+    return buffer.tobytes()
+
+def encode_jpeg(img, quality=JPEG_QUALITY):
+    """Encode an RGB image as quality-capped JPEG bytes"""
+    ok, buffer = cv2.imencode('.jpg', cv2.cvtColor(img, cv2.COLOR_RGB2BGR), [cv2.IMWRITE_JPEG_QUALITY, quality])
+    if not ok:
+        raise ValueError("Could not encode image as JPEG")
+    return buffer.tobytes()
+
+def build_image_variants(img):
+    """Return {variant_name: webp_bytes} for every size in IMAGE_VARIANTS"""
+    return {name: encode_webp(resize_max_side(img, max_side)) for name, max_side in IMAGE_VARIANTS.items()}
+
+
+def calculate_ulcer_area(mask, image_shape=None, pixel_to_mm_ratio=1.0):
     """Calculate ulcer area in mm²"""
-    return np.sum(mask > 0) * pixel_to_mm_ratio
+    return calculate_mask_metrics(mask, image_shape, pixel_to_mm_ratio)['area']
 
 # import cv2
 # import numpy as np
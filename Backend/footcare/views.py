@@ -1,6 +1,6 @@
 import os
 import cv2
-from django.core.files.storage import FileSystemStorage
+from django.core.files.storage import FileSystemStorage, default_storage
 from django.shortcuts import get_object_or_404
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes, parser_classes
@@ -10,7 +10,13 @@ from drf_yasg.utils import swagger_auto_schema
 from rest_framework.parsers import MultiPartParser, FormParser
 from .models import FootUlcer
 from .serializers import FootUlcerSerializer
-from .utils import classify_image, apply_segmentation, calculate_ulcer_area
+from .pagination import FootUlcerCursorPagination
+from .analytics import compute_healing_trends
+from drf_yasg import openapi
+from .utils import (
+    classify_image, apply_segmentation, calculate_mask_metrics, pack_mask, unpack_mask, mask_iou,
+    build_image_variants, encode_jpeg,
+)
 from django.db.models import Max
 import numpy as np
 from django.utils.text import get_valid_filename
@@ -28,6 +34,20 @@ SEGMENTED_FOLDER = os.path.join(UPLOAD_FOLDER, 'segmented')
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 os.makedirs(SEGMENTED_FOLDER, exist_ok=True)
 
+
+def save_image_variants(img_rgb, prefix=''):
+    """Save the thumbnail/medium WebP copies of an image through default_storage.
+
+    Returns their storage names (media-relative paths) by variant.
+    """
+    return {
+        variant: default_storage.save(
+            os.path.join('uploads', 'resized', f"{prefix}{uuid.uuid4().hex}_{variant}.webp"),
+            ContentFile(data),
+        )
+        for variant, data in build_image_variants(img_rgb).items()
+    }
+
 # 1. Create function (image upload, classification, segmentation, and save the foot ulcer)
 @swagger_auto_schema(method='post', request_body=FootUlcerSerializer, responses={201: FootUlcerSerializer, 400: 'Bad Request'})
 @parser_classes([MultiPartParser, FormParser])
@@ -57,17 +77,22 @@ def create_foot_ulcer(request):
         img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
         classification_label, confidence = classify_image(img_rgb)
         segmented_img, mask = apply_segmentation(img_rgb, classification_label)
-        ulcer_area = calculate_ulcer_area(mask)
+        metrics = calculate_mask_metrics(mask, img.shape[:2])
+        ulcer_area = metrics['area']
 
         # Save original image
         fs = FileSystemStorage(location=UPLOAD_FOLDER)
         saved_filename = fs.save(unique_filename, ContentFile(img_bytes))
         relative_image_path = os.path.join('uploads', saved_filename)
-        # Save segmented image
-        segmented_filename = f"segmented_{unique_filename}"
-        segmented_path = os.path.join(SEGMENTED_FOLDER, segmented_filename)
-        cv2.imwrite(segmented_path, cv2.cvtColor(segmented_img, cv2.COLOR_RGB2BGR))
-        relative_segmented_path = os.path.join('uploads', 'segmented', segmented_filename)
+        # Save segmented image (re-encoded as quality-capped JPEG)
+        segmented_filename = f"segmented_{uuid_str}_{get_valid_filename(original_name)}.jpg"
+        relative_segmented_path = default_storage.save(
+            os.path.join('uploads', 'segmented', segmented_filename), ContentFile(encode_jpeg(segmented_img))
+        )
+
+        # Save thumbnail and medium copies for the history screens
+        image_variants = save_image_variants(img_rgb)
+        segmented_variants = save_image_variants(segmented_img, prefix='segmented_')
 
         # Track improvement
         previous_ulcer = FootUlcer.objects.filter(
@@ -78,7 +103,8 @@ def create_foot_ulcer(request):
         improvement_data = {
             'last_area': None,
             'area_difference': None,
-            'improvement_message': None
+            'improvement_message': None,
+            'mask_iou': None
         }
 
         if previous_ulcer:
@@ -87,7 +113,8 @@ def create_foot_ulcer(request):
                 'last_area': previous_ulcer.ulcer_area,
                 'area_difference': area_difference,
                 'improvement_message': "Improvement detected!" if area_difference < 0 
-                                    else "Condition not improved"
+                                    else "Condition not improved",
+                'mask_iou': mask_iou(mask, unpack_mask(previous_ulcer.mask)) if previous_ulcer.mask else None
             }
 
         # Create record
@@ -98,7 +125,14 @@ def create_foot_ulcer(request):
             classification_result=classification_label,
             confidence=confidence,
             segmented_image=relative_segmented_path,
+            image_thumbnail=image_variants['thumbnail'],
+            image_medium=image_variants['medium'],
+            segmented_thumbnail=segmented_variants['thumbnail'],
+            segmented_medium=segmented_variants['medium'],
             ulcer_area=ulcer_area,
+            ulcer_perimeter=metrics['perimeter'],
+            bounding_box=metrics['bounding_box'],
+            mask=pack_mask(mask),
             **improvement_data
         )
 
@@ -111,15 +145,36 @@ def create_foot_ulcer(request):
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
+# Query parameters shared by the history endpoints
+history_parameters = [
+    openapi.Parameter('fields', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                      description='Comma-separated subset of fields, e.g. "id,ulcer_area,uploaded_at"'),
+    openapi.Parameter('page_size', openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+                      description='Enable cursor pagination with this page size (max 100)'),
+    openapi.Parameter('cursor', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                      description='Cursor returned in "next"/"previous" of a paginated response'),
+]
+
+
+def ulcer_history_response(request, queryset):
+    """Serialize a history queryset, honouring the fields/page_size/cursor query parameters."""
+    fields = request.query_params.get('fields')
+    fields = [field.strip() for field in fields.split(',') if field.strip()] if fields else None
+
+    return FootUlcerCursorPagination().list_response(
+        request, queryset,
+        lambda rows: FootUlcerSerializer(rows, many=True, fields=fields, context={'request': request}).data,
+    )
+
+
 # 2. Retrieve all foot ulcers
-@swagger_auto_schema(method='get', responses={200: FootUlcerSerializer(many=True)})
+@swagger_auto_schema(method='get', manual_parameters=history_parameters, responses={200: FootUlcerSerializer(many=True)})
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_all_foot_ulcers(request):
     """Retrieve all foot ulcer records for the authenticated user."""
     foot_ulcers = FootUlcer.objects.filter(user=request.user)
-    serializer = FootUlcerSerializer(foot_ulcers, many=True, context={'request': request})
-    return Response(serializer.data)
+    return ulcer_history_response(request, foot_ulcers)
 
 #  3. Retrieve the latest foot ulcer per region
 @swagger_auto_schema(method='get', responses={200: FootUlcerSerializer(many=True)})
@@ -143,8 +198,45 @@ def get_latest_ulcers_per_region(request):
     return Response(serializer.data)
 
 
+# Healing trend per region
+@swagger_auto_schema(method='get', responses={200: 'Area time series, healing rate and percent changes per region'})
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_healing_trends(request):
+    """Return the healing trend of every region for the authenticated user.
+
+    All measurements are fetched in one query and the statistics are computed
+    for all regions at once (see footcare.analytics.compute_healing_trends).
+    """
+    rows = list(
+        FootUlcer.objects
+        .filter(user=request.user, ulcer_area__isnull=False)
+        .order_by('region', 'uploaded_at', 'id')
+        .values_list('region', 'uploaded_at', 'ulcer_area')
+    )
+    if not rows:
+        return Response([], status=200)
+
+    regions, uploaded_at, areas = zip(*rows)
+    timestamps = [dt.timestamp() for dt in uploaded_at]
+    trends = compute_healing_trends(regions, timestamps, areas)
+
+    data = []
+    for region, trend in trends.items():
+        start, end = trend.pop('start'), trend.pop('end')
+        data.append({
+            'region': region,
+            **trend,
+            'series': [
+                {'uploaded_at': uploaded_at[i], 'ulcer_area': areas[i]}
+                for i in range(start, end)
+            ],
+        })
+    return Response(data, status=200)
+
+
 # 3. Retrieve all foot ulcers for a specific region
-@swagger_auto_schema(method='get', responses={200: FootUlcerSerializer(many=True)})
+@swagger_auto_schema(method='get', manual_parameters=history_parameters, responses={200: FootUlcerSerializer(many=True)})
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_ulcers_by_region(request):
@@ -155,8 +247,7 @@ def get_ulcers_by_region(request):
         return Response({'error': 'Region parameter is required.'}, status=400)
 
     ulcers = FootUlcer.objects.filter(user=request.user, region=region).order_by('-id')
-    serializer = FootUlcerSerializer(ulcers, many=True, context={'request': request})
-    return Response(serializer.data, status=200)
+    return ulcer_history_response(request, ulcers)
 
 # 3. Retrieve a specific foot ulcer
 @swagger_auto_schema(method='get', responses={200: FootUlcerSerializer, 404: 'Not Found'})
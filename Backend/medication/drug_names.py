@@ -0,0 +1,114 @@
+#medication/drug_names.py
+
+import json
+import os
+import re
+from collections import Counter
+from difflib import SequenceMatcher
+
+
+def normalize_drug_name(name):
+    """Lowercase, drop punctuation and collapse whitespace: ' Insulin-Glargine ' -> 'insulin glargine'."""
+    if not name:
+        return ''
+    name = re.sub(r'[^a-z0-9]+', ' ', str(name).lower())
+    return ' '.join(name.split())
+
+
+def trigrams(text):
+    padded = f'  {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class DrugNameResolver:
+    """In-memory index over the drug names known to the interaction model.
+
+    Built once from the ``drug_index`` keys: an exact map on normalized names,
+    an optional synonyms table (brand name -> generic name) and a trigram
+    index used for misspellings and autocomplete.
+
+    Only exact and synonym matches are ever resolved to a drug; fuzzy matches
+    are suggestions for the user to pick from, because a close spelling can
+    be a different drug ('insulin' vs 'Inulin').
+    """
+
+    def __init__(self, names, synonyms=None):
+        self.names = sorted(set(names))
+        self.exact = {normalize_drug_name(name): name for name in self.names}
+        self.synonyms = {}
+        for alias, target in (synonyms or {}).items():
+            target = self.exact.get(normalize_drug_name(target))
+            if target:
+                self.synonyms[normalize_drug_name(alias)] = target
+
+        # Trigram posting lists over the normalized names and synonyms
+        self.entries = list(self.exact.items()) + list(self.synonyms.items())
+        self.postings = {}
+        self.gram_counts = []
+        for entry_id, (normalized, _) in enumerate(self.entries):
+            grams = trigrams(normalized)
+            self.gram_counts.append(len(grams))
+            for gram in grams:
+                self.postings.setdefault(gram, []).append(entry_id)
+
+    @classmethod
+    def from_files(cls, names, synonyms_path=None):
+        """Build the resolver, loading a JSON {alias: generic} synonyms file when it exists."""
+        synonyms = None
+        if synonyms_path and os.path.exists(synonyms_path):
+            with open(synonyms_path, encoding='utf-8') as f:
+                synonyms = json.load(f)
+        return cls(names, synonyms)
+
+    def _candidates(self, query, limit):
+        """Best fuzzy matches as [(canonical_name, score)], best first."""
+        query_grams = trigrams(query)
+        shared = Counter()
+        for gram in query_grams:
+            shared.update(self.postings.get(gram, ()))
+        if not shared:
+            return []
+
+        # Rank by trigram (Dice) similarity, then re-score the short list by edit similarity
+        ranked = sorted(
+            shared,
+            key=lambda entry_id: 2 * shared[entry_id] / (len(query_grams) + self.gram_counts[entry_id]),
+            reverse=True,
+        )[:max(limit * 4, 20)]
+
+        best = {}
+        for entry_id in ranked:
+            normalized, name = self.entries[entry_id]
+            score = SequenceMatcher(None, query, normalized).ratio()
+            if score > best.get(name, 0):
+                best[name] = score
+        return sorted(best.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+    def resolve(self, name):
+        """Canonical name for an exact (normalized) or synonym match, else None."""
+        query = normalize_drug_name(name)
+        return self.exact.get(query) or self.synonyms.get(query)
+
+    def search(self, query, limit=10):
+        """Autocomplete: prefix matches first (closest length first), then fuzzy matches."""
+        query = normalize_drug_name(query)
+        if not query:
+            return []
+
+        results = {}
+        prefix_matches = sorted(
+            (len(query) / len(normalized), name)
+            for normalized, name in self.entries if normalized.startswith(query)
+        )
+        for score, name in reversed(prefix_matches):
+            results.setdefault(name, score)
+            if len(results) >= limit:
+                break
+
+        if len(results) < limit:
+            for name, score in self._candidates(query, limit):
+                results.setdefault(name, score)
+                if len(results) >= limit:
+                    break
+
+        return [{'name': name, 'confidence': round(score, 3)} for name, score in results.items()]
@@ -0,0 +1,192 @@
+#medication/interactions.py
+
+from django.conf import settings
+from django.core.cache import cache
+from functools import lru_cache
+import hashlib
+import joblib
+import numpy as np
+import os
+from .drug_names import DrugNameResolver, normalize_drug_name
+
+#Load matrices
+u = np.load(settings.U_MATRIX_PATH)
+vt = np.load(settings.VT_MATRIX_PATH)
+drug_index = np.load(settings.DRUG_INDEX_PATH, allow_pickle=True).item()
+
+# Name resolution (normalized names, brand synonyms) and suggestions, built once from the model's drug names
+drug_name_resolver = DrugNameResolver.from_files(drug_index.keys(), getattr(settings, 'DRUG_SYNONYMS_PATH', None))
+
+# Marker for pairs missing from the precomputed table
+UNCACHED_SEVERITY = 255
+
+# Severity Mapping for drug interactions
+severity_messages = {
+    3: "Major interaction: Serious side effects may occur. Consult a healthcare provider.",
+    2: "Moderate interaction: Potential interactions. Seek medical advice if needed.",
+    1: "Minor interaction: Minimal effects expected.",
+    0: "No known interaction."
+}
+
+
+def load_interaction_table(path=None):
+    """Memory-map the precomputed (n_drugs, n_drugs) uint8 severity table, if it exists."""
+    path = path or getattr(settings, 'DRUG_INTERACTION_TABLE_PATH', None)
+    if not path or not os.path.exists(path):
+        return None
+    table = np.load(path, mmap_mode='r')
+    if table.shape != (len(drug_index), len(drug_index)):
+        return None
+    return table
+
+interaction_table = load_interaction_table()
+
+
+@lru_cache(maxsize=None)
+def get_classifier():
+    """Unpickle the random forest on first use (only needed for pairs missing from the table)."""
+    return joblib.load(settings.DRUG_INTERACTION_MODEL_PATH)
+
+
+def lookup_drug_index(name):
+    """Index of a drug in the model by exact or synonym name (None if unknown).
+
+    Misspellings are never guessed here: checking interactions for the wrong
+    drug is worse than reporting the name as unknown. search_drugs offers
+    suggestions instead.
+    """
+    canonical = drug_name_resolver.resolve(name)
+    if canonical is None:
+        return None
+    return drug_index[canonical]
+
+
+def build_features(a_indices, b_indices):
+    """Feature matrix for the pairs (a_indices[i], b_indices[i]): u[a] next to vt[b]."""
+    return np.hstack([u[a_indices], vt[b_indices]])
+
+
+def predict_severities(a_indices, b_indices):
+    """Severity codes for many drug-index pairs.
+
+    Pairs found in the precomputed table are a plain array lookup; the rest
+    go through the random forest in one batched call.
+    """
+    a_indices = np.asarray(a_indices, dtype=np.intp)
+    b_indices = np.asarray(b_indices, dtype=np.intp)
+    if interaction_table is not None:
+        severities = np.asarray(interaction_table[a_indices, b_indices], dtype=np.int64)
+    else:
+        severities = np.full(a_indices.shape, UNCACHED_SEVERITY, dtype=np.int64)
+
+    missing = severities == UNCACHED_SEVERITY
+    if missing.any():
+        severities[missing] = get_classifier().predict(build_features(a_indices[missing], b_indices[missing]))
+    return severities
+
+# Function to predict the severity of a drug interaction
+def predict_interaction(drug_a, drug_b):
+    """Predict severity of drug interaction."""
+    idx1 = lookup_drug_index(drug_a)
+    idx2 = lookup_drug_index(drug_b)
+    if idx1 is None or idx2 is None:
+        return None
+    severity_prediction = predict_severities([idx1], [idx2])[0]
+    return severity_messages.get(severity_prediction, "Unknown interaction level.")
+
+# Function to predict the interactions of one drug with many drugs in a single model call
+def predict_interactions(drugs, new_drug):
+    """Predict the severity of (drug, new_drug) for every drug in `drugs`.
+
+    Returns {drug: message} for the pairs the model knows; unknown drugs are
+    left out, exactly like predict_interaction returning None.
+    """
+    new_idx = lookup_drug_index(new_drug)
+    if new_idx is None:
+        return {}
+
+    known_drugs = []
+    indices = []
+    for drug in drugs:
+        idx = lookup_drug_index(drug)
+        if idx is not None:
+            known_drugs.append(drug)
+            indices.append(idx)
+    if not indices:
+        return {}
+
+    severities = predict_severities(indices, np.full(len(indices), new_idx))
+    return {
+        drug: severity_messages.get(severity, "Unknown interaction level.")
+        for drug, severity in zip(known_drugs, severities)
+    }
+
+
+# Cached whole-regimen reports are keyed by the regimen itself, so any
+# medication change yields a new key and stale reports are never served.
+REGIMEN_REPORT_TIMEOUT = 60 * 60 * 24
+
+def normalize_regimen(drugs):
+    """Sorted, de-duplicated regimen names: the canonical name of known drugs, the normalized name otherwise.
+
+    Names differing only in case, spacing or punctuation become the same
+    entry, so equal regimens share one report and one display form.
+    """
+    names = set()
+    for drug in drugs:
+        normalized = normalize_drug_name(drug)
+        if normalized:
+            names.add(drug_name_resolver.resolve(normalized) or normalized)
+    return sorted(names)
+
+def regimen_fingerprint(drugs):
+    """Stable hash of a regimen as returned by normalize_regimen."""
+    return hashlib.sha1('|'.join(drugs).encode('utf-8')).hexdigest()
+
+def regimen_interaction_report(drugs):
+    """Evaluate every ordered pair of a regimen in one batched prediction.
+
+    Returns the drug list, an N x N severity matrix (row drug -> column drug,
+    None on the diagonal and for drugs the model does not know), the
+    interacting pairs with their messages and the unknown drugs.
+    """
+    drugs = normalize_regimen(drugs)
+    fingerprint = regimen_fingerprint(drugs)
+    cache_key = f'medication:regimen:{fingerprint}'
+    report = cache.get(cache_key)
+    if report is not None:
+        return report
+
+    indices = [lookup_drug_index(drug) for drug in drugs]
+    indices = np.array([-1 if idx is None else idx for idx in indices], dtype=np.intp)
+    known = np.flatnonzero(indices >= 0)
+    matrix = np.full((len(drugs), len(drugs)), -1, dtype=np.int64)
+
+    if known.size > 1:
+        rows, cols = np.meshgrid(known, known, indexing='ij')
+        off_diagonal = rows != cols
+        rows, cols = rows[off_diagonal], cols[off_diagonal]
+        matrix[rows, cols] = predict_severities(indices[rows], indices[cols])
+
+    # A pair interacts as strongly as its worse direction
+    interactions = []
+    for i, j in zip(*np.triu_indices(len(drugs), k=1)):
+        severity = int(max(matrix[i, j], matrix[j, i]))
+        if severity > 0:
+            interactions.append({
+                'drug_a': drugs[i],
+                'drug_b': drugs[j],
+                'severity': severity,
+                'message': severity_messages.get(severity, "Unknown interaction level."),
+            })
+    interactions.sort(key=lambda item: item['severity'], reverse=True)
+
+    report = {
+        'fingerprint': fingerprint,
+        'medications': drugs,
+        'matrix': [[None if value < 0 else int(value) for value in row] for row in matrix],
+        'interactions': interactions,
+        'unknown_medications': [drugs[i] for i in np.flatnonzero(indices < 0)],
+    }
+    cache.set(cache_key, report, REGIMEN_REPORT_TIMEOUT)
+    return report
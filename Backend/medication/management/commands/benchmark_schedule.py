@@ -0,0 +1,40 @@
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from medication.models import Medication
+from medication.utils import get_scheduled_doses
+
+
+class Command(BaseCommand):
+    help = 'Time the dose schedule engine on synthetic (unsaved) medications'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--medications', type=int, default=500, help='Number of medications (default: 500)')
+        parser.add_argument('--days', type=int, default=30, help='Window length in days (default: 30)')
+        parser.add_argument('--repeat', type=int, default=5, help='Runs to take the best time of (default: 5)')
+
+    def handle(self, *args, **options):
+        start = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        medications = [
+            Medication(
+                medication_name=f'Medication {i}',
+                dosage_quantity_of_units_per_time=1,
+                dosage_frequency=1 + i % 4,
+                periodic_interval=('daily', 'weekly', 'monthly')[i % 3],
+                first_time_of_intake=start - timedelta(days=3, hours=-8),
+            )
+            for i in range(options['medications'])
+        ]
+        end = start + timedelta(days=options['days'])
+
+        timings = []
+        for _ in range(max(1, options['repeat'])):
+            started = time.perf_counter()
+            doses = get_scheduled_doses(medications, start, end)
+            timings.append(time.perf_counter() - started)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(doses)} doses for {len(medications)} medications over {options['days']} days "
+            f"in {min(timings) * 1000:.1f} ms (best of {len(timings)})"
+        ))
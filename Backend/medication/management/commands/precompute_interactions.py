@@ -0,0 +1,70 @@
+import os
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+from medication.models import Medication
+from medication.interactions import (
+    drug_index, lookup_drug_index, build_features, get_classifier, UNCACHED_SEVERITY,
+)
+
+
+class Command(BaseCommand):
+    help = 'Precompute the drug-pair interaction severities into a memory-mappable uint8 .npy table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top-n', type=int, default=None,
+                            help='Only precompute pairs among the N most prescribed drugs (default: all drugs)')
+        parser.add_argument('--output', default=settings.DRUG_INTERACTION_TABLE_PATH,
+                            help='Path of the .npy table to write')
+        parser.add_argument('--chunk-size', type=int, default=64,
+                            help='Number of table rows predicted per model call')
+
+    def handle(self, *args, **options):
+        n_drugs = len(drug_index)
+        if options['top_n']:
+            drugs = self.most_prescribed(options['top_n'])
+        else:
+            drugs = np.arange(n_drugs)
+        self.stdout.write(f'Precomputing {len(drugs) ** 2} pairs for {len(drugs)} drugs')
+
+        # Write to a temporary memmap so a partial run never replaces a good table
+        output = options['output']
+        tmp_output = f'{output}.tmp.npy'
+        table = np.lib.format.open_memmap(tmp_output, mode='w+', dtype=np.uint8, shape=(n_drugs, n_drugs))
+        table[:] = UNCACHED_SEVERITY
+
+        clf = get_classifier()
+        chunk_size = max(1, options['chunk_size'])
+        for start in range(0, len(drugs), chunk_size):
+            rows = drugs[start:start + chunk_size]
+            a_indices = np.repeat(rows, len(drugs))
+            b_indices = np.tile(drugs, len(rows))
+            severities = clf.predict(build_features(a_indices, b_indices))
+            table[a_indices, b_indices] = np.asarray(severities, dtype=np.uint8)
+
+        table.flush()
+        del table
+        os.replace(tmp_output, output)
+        self.stdout.write(self.style.SUCCESS(f'Interaction table written to {output}'))
+
+    def most_prescribed(self, top_n):
+        """Indices of the top_n drug names most often found in Medication, padded with the rest of the index."""
+        counts = (
+            Medication.objects
+            .values('medication_name')
+            .annotate(total=Count('id'))
+            .order_by('-total')
+        )
+        indices = {}  # insertion-ordered set
+        for row in counts:
+            idx = lookup_drug_index(row['medication_name'])
+            if idx is not None:
+                indices.setdefault(idx)
+            if len(indices) >= top_n:
+                break
+        for idx in range(len(drug_index)):
+            if len(indices) >= top_n:
+                break
+            indices.setdefault(idx)
+        return np.fromiter(indices, dtype=np.intp)
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from medication.reminders import dispatch_due_doses, materialize_doses
+
+
+class Command(BaseCommand):
+    help = 'Send the medication reminders due in the next minute (run every minute from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--materialize', action='store_true',
+                            help='Materialize the upcoming doses of all active medications first (run hourly)')
+
+    def handle(self, *args, **options):
+        if options['materialize']:
+            count = materialize_doses()
+            self.stdout.write(f'Materialized {count} upcoming doses')
+
+        dispatched = dispatch_due_doses()
+        self.stdout.write(self.style.SUCCESS(f'Dispatched {dispatched} medication reminders'))
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.16 on 2026-10-19 18:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medication', '0008_remove_medication_is_chronic_or_acute'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='medication',
+            index=models.Index(fields=['user', 'first_time_of_intake', 'stopped_by_datetime'], name='medication_user_schedule_idx'),
+        ),
+    ]
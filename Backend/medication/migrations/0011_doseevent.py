@@ -0,0 +1,35 @@
+# Generated by Django 4.2.16 on 2026-10-19 18:57
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('medication', '0010_device_scheduleddose'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DoseEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scheduled_time', models.DateTimeField()),
+                ('status', models.CharField(choices=[('taken', 'Taken'), ('late', 'Taken late'), ('skipped', 'Skipped')], max_length=10)),
+                ('recorded_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('medication', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='dose_events', to='medication.medication')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='dose_events', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'scheduled_time'], name='doseevent_user_time_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='doseevent',
+            constraint=models.UniqueConstraint(fields=('medication', 'scheduled_time'), name='unique_dose_event'),
+        ),
+    ]
@@ -1,6 +1,8 @@
 from django.db import models
 from accounts.models import User
 from django.utils import timezone
+from django.db.models.signals import post_save
+from django.dispatch import receiver
 
 class Medication(models.Model):
     ROUTE_CHOICES = (
@@ -45,6 +47,10 @@ class Medication(models.Model):
     first_time_of_intake = models.DateTimeField(default=timezone.now)
     stopped_by_datetime = models.DateTimeField(null=True, blank=True)
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'first_time_of_intake', 'stopped_by_datetime'], name='medication_user_schedule_idx'),
+        ]
     
     def __str__(self):
         return self.medication_name
@@ -65,3 +71,85 @@ class Medication(models.Model):
 
     
 
+
+
+class Device(models.Model):
+    PLATFORM_CHOICES = (
+        ('ios', 'iOS'),
+        ('android', 'Android'),
+    )
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='devices')
+    device_token = models.CharField(max_length=255, unique=True)
+    platform = models.CharField(max_length=10, choices=PLATFORM_CHOICES, default='android')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.user.email} - {self.platform}"
+
+
+class ScheduledDose(models.Model):
+    """A materialized dose time, the unit the reminder dispatcher works on."""
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    )
+
+    medication = models.ForeignKey(Medication, on_delete=models.CASCADE, related_name='scheduled_doses')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='scheduled_doses')
+    scheduled_time = models.DateTimeField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    sent_at = models.DateTimeField(null=True, blank=True)
+    # Send attempts so far; a failed send is retried no earlier than retry_after
+    attempts = models.PositiveSmallIntegerField(default=0)
+    retry_after = models.DateTimeField(null=True, blank=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    # "<medication id>:<unix time>", makes materializing and sending the same dose idempotent
+    idempotency_key = models.CharField(max_length=64, unique=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'scheduled_time'], name='scheduleddose_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.medication.medication_name} - {self.scheduled_time}"
+
+    @staticmethod
+    def make_idempotency_key(medication_id, scheduled_time):
+        return f"{medication_id}:{int(scheduled_time.timestamp())}"
+
+
+class DoseEvent(models.Model):
+    """What happened to one scheduled dose of a medication."""
+    STATUS_CHOICES = (
+        ('taken', 'Taken'),
+        ('late', 'Taken late'),
+        ('skipped', 'Skipped'),
+    )
+
+    medication = models.ForeignKey(Medication, on_delete=models.CASCADE, related_name='dose_events')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='dose_events')
+    scheduled_time = models.DateTimeField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES)
+    recorded_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['medication', 'scheduled_time'], name='unique_dose_event'),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'scheduled_time'], name='doseevent_user_time_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.medication.medication_name} - {self.scheduled_time} - {self.status}"
+
+
+@receiver(post_save, sender=Medication)
+def reschedule_medication_doses(sender, instance, **kwargs):
+    """Rebuild the pending reminders of a medication whenever it changes."""
+    from .reminders import rematerialize_medication
+    rematerialize_medication(instance)
@@ -0,0 +1,207 @@
+#medication/reminders.py
+
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from .models import Medication, ScheduledDose, Device
+from .utils import get_scheduled_doses
+
+logger = logging.getLogger(__name__)
+
+# How far ahead dose reminders are materialized
+MATERIALIZE_HORIZON = timedelta(hours=48)
+# Doses due within this lead time are sent by the current run (the dispatcher runs every minute)
+DISPATCH_LEAD = timedelta(minutes=1)
+# Doses older than this are treated as missed and are no longer sent
+DISPATCH_GRACE = timedelta(minutes=15)
+# FCM accepts at most 500 tokens per multicast message
+MULTICAST_BATCH_SIZE = 500
+# A failed send is retried after RETRY_BACKOFF * 2 ** (attempts - 1), up to MAX_SEND_ATTEMPTS times
+MAX_SEND_ATTEMPTS = 3
+RETRY_BACKOFF = timedelta(minutes=1)
+# Claimed doses whose dispatcher died before recording the outcome are picked up again after this
+CLAIM_TIMEOUT = timedelta(minutes=5)
+
+
+class LocalTransport:
+    """In-memory transport for tests (enable with override_settings); messages are kept in `outbox`."""
+
+    def __init__(self):
+        self.outbox = []
+
+    def send_multicast(self, tokens, title, body, data=None):
+        self.outbox.append({'tokens': list(tokens), 'title': title, 'body': body, 'data': data or {}})
+        return []
+
+
+class FCMTransport:
+    """Firebase Cloud Messaging via firebase_admin (credentials from GOOGLE_APPLICATION_CREDENTIALS)."""
+
+    def __init__(self):
+        import firebase_admin
+        from firebase_admin import messaging
+        if not firebase_admin._apps:
+            firebase_admin.initialize_app()
+        self.messaging = messaging
+
+    def send_multicast(self, tokens, title, body, data=None):
+        """Send one message to every token; returns the tokens it could not be delivered to."""
+        tokens = list(tokens)
+        message = self.messaging.MulticastMessage(
+            tokens=tokens,
+            notification=self.messaging.Notification(title=title, body=body),
+            data=data or {},
+        )
+        # Per-token failures are reported in the response, not raised
+        response = self.messaging.send_each_for_multicast(message)
+        return [token for token, result in zip(tokens, response.responses) if not result.success]
+
+
+def get_transport():
+    """Instantiate the transport configured in settings.MEDICATION_REMINDER_TRANSPORT."""
+    return import_string(settings.MEDICATION_REMINDER_TRANSPORT)()
+
+
+def materialize_doses(start=None, horizon=MATERIALIZE_HORIZON, medications=None, chunk_size=2000):
+    """Create the ScheduledDose rows of [start, start + horizon) for the given (default: all active) medications.
+
+    Existing rows are left untouched thanks to the unique idempotency key, so
+    the job can be re-run at any time. Returns the number of doses considered.
+    """
+    start = start or timezone.now()
+    end = start + horizon
+    if medications is None:
+        medications = Medication.objects.filter(
+            first_time_of_intake__lt=end
+        ).filter(
+            Q(stopped_by_datetime__isnull=True) | Q(stopped_by_datetime__gte=start)
+        ).iterator(chunk_size=chunk_size)
+
+    total = 0
+    chunk = []
+    for medication in medications:
+        chunk.append(medication)
+        if len(chunk) >= chunk_size:
+            total += _materialize_chunk(chunk, start, end)
+            chunk = []
+    if chunk:
+        total += _materialize_chunk(chunk, start, end)
+    return total
+
+
+def _materialize_chunk(medications, start, end):
+    doses = [
+        ScheduledDose(
+            medication=medication,
+            user_id=medication.user_id,
+            scheduled_time=dose_time,
+            idempotency_key=ScheduledDose.make_idempotency_key(medication.id, dose_time),
+        )
+        for medication, dose_time in get_scheduled_doses(medications, start, end)
+    ]
+    ScheduledDose.objects.bulk_create(doses, batch_size=1000, ignore_conflicts=True)
+    return len(doses)
+
+
+def rematerialize_medication(medication):
+    """Drop the pending future reminders of a medication and rebuild them from its current schedule."""
+    now = timezone.now()
+    ScheduledDose.objects.filter(medication=medication, status='pending', scheduled_time__gte=now).delete()
+    materialize_doses(start=now, medications=[medication])
+
+
+def dispatch_due_doses(now=None, transport=None, batch_size=MULTICAST_BATCH_SIZE):
+    """Send every pending reminder due in the next minute.
+
+    Doses are claimed (pending -> sending) inside a row-locking transaction,
+    so concurrent dispatchers never pick the same dose. They are marked sent
+    only once their message went out; a failed send puts them back to pending
+    with a backoff, and after MAX_SEND_ATTEMPTS they are marked failed. Users
+    due for the same medication share one multicast message. Returns the
+    number of doses sent.
+    """
+    now = now or timezone.now()
+    transport = transport or get_transport()
+    due = ScheduledDose.objects.filter(
+        Q(status='pending', retry_after__isnull=True)
+        | Q(status='pending', retry_after__lte=now)
+        | Q(status='sending', claimed_at__lt=now - CLAIM_TIMEOUT),
+        scheduled_time__gte=now - DISPATCH_GRACE,
+        scheduled_time__lt=now + DISPATCH_LEAD,
+    )
+
+    dispatched = 0
+    while True:
+        with transaction.atomic():
+            doses = list(
+                due.select_for_update(skip_locked=True, of=('self',))
+                .select_related('medication')
+                .order_by('scheduled_time')[:batch_size]
+            )
+            if not doses:
+                break
+            ScheduledDose.objects.filter(id__in=[dose.id for dose in doses]).update(
+                status='sending', claimed_at=now, attempts=F('attempts') + 1,
+            )
+
+        failed_ids = _send_reminders(doses, transport, batch_size)
+        sent_ids = [dose.id for dose in doses if dose.id not in failed_ids]
+        ScheduledDose.objects.filter(id__in=sent_ids).update(status='sent', sent_at=now)
+        _record_failures([dose for dose in doses if dose.id in failed_ids], now)
+        dispatched += len(sent_ids)
+
+    return dispatched
+
+
+def _record_failures(doses, now):
+    """Put failed doses back in the queue with exponential backoff, or give up on them."""
+    for dose in doses:
+        attempts = dose.attempts + 1  # the claim incremented it in the database
+        if attempts >= MAX_SEND_ATTEMPTS:
+            ScheduledDose.objects.filter(id=dose.id).update(status='failed')
+        else:
+            ScheduledDose.objects.filter(id=dose.id).update(
+                status='pending', retry_after=now + RETRY_BACKOFF * 2 ** (attempts - 1),
+            )
+
+
+def _send_reminders(doses, transport, batch_size):
+    """Send the reminders of `doses`; returns the ids of the doses whose message failed."""
+    tokens_by_user = defaultdict(list)
+    for user_id, token in Device.objects.filter(
+        user_id__in={dose.user_id for dose in doses}
+    ).values_list('user_id', 'device_token'):
+        tokens_by_user[user_id].append(token)
+
+    # One message per medication name, sent to every device due for it
+    doses_by_token = defaultdict(lambda: defaultdict(list))
+    for dose in doses:
+        for token in tokens_by_user.get(dose.user_id, ()):
+            doses_by_token[dose.medication.medication_name][token].append(dose.id)
+
+    failed_ids = set()
+    for medication_name, dose_ids_by_token in doses_by_token.items():
+        tokens = sorted(dose_ids_by_token)
+        for i in range(0, len(tokens), batch_size):
+            batch = tokens[i:i + batch_size]
+            try:
+                failed_tokens = transport.send_multicast(
+                    batch,
+                    title="Medication Reminder",
+                    body=f"It's time to take your medication: {medication_name}.",
+                    data={'type': 'medication_reminder', 'medication_name': medication_name},
+                )
+            except Exception:
+                logger.exception("Failed to send reminders for %s", medication_name)
+                failed_tokens = batch
+            if failed_tokens:
+                logger.warning("%d of %d reminders for %s were not delivered",
+                               len(failed_tokens), len(batch), medication_name)
+            for token in failed_tokens:
+                failed_ids.update(dose_ids_by_token[token])
+    return failed_ids
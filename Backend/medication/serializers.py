@@ -1,6 +1,6 @@
 #medication/serializers.py
 from rest_framework import serializers
-from .models import Medication
+from .models import Medication, Device, DoseEvent
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 import pytz
 from django.utils import timezone
@@ -84,3 +84,28 @@ class MedicationSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Dosage quantity must be a positive number.")
         return value
 
+
+class DeviceSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Device
+        fields = ['id', 'device_token', 'platform', 'created_at']
+        read_only_fields = ['id', 'created_at']
+        # Tokens move between accounts when users log in on a shared device
+        extra_kwargs = {'device_token': {'validators': []}}
+
+
+class DoseEventSerializer(serializers.ModelSerializer):
+    medication = serializers.PrimaryKeyRelatedField(queryset=Medication.objects.all())
+
+    class Meta:
+        model = DoseEvent
+        fields = ['id', 'medication', 'scheduled_time', 'status', 'recorded_at']
+        read_only_fields = ['id']
+        # A dose can be recorded again to correct it (handled with update_or_create in the view)
+        validators = []
+
+    def validate_medication(self, value):
+        request = self.context.get('request')
+        if request and value.user_id != request.user.id:
+            raise serializers.ValidationError("Medication not found.")
+        return value
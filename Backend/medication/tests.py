@@ -1,3 +1,352 @@
-from django.test import TestCase
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+from unittest import mock
+import os
+import shutil
+import tempfile
 
-# Create your tests here.
+import numpy as np
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from . import interactions
+from .drug_names import DrugNameResolver
+from rest_framework.test import APIClient
+
+from .models import Medication, Device, ScheduledDose, DoseEvent
+from .reminders import LocalTransport, dispatch_due_doses
+from .utils import dose_spacing_seconds, get_scheduled_doses
+
+
+class DrugNameResolverTest(SimpleTestCase):
+    resolver = DrugNameResolver(
+        ['Metformin', 'Methadone', 'Insulin glargine', 'Inulin', 'Acetaminophen'],
+        synonyms={'Tylenol': 'Acetaminophen'},
+    )
+
+    def test_exact_and_synonym_matches(self):
+        self.assertEqual(self.resolver.resolve(' METFORMIN '), 'Metformin')
+        self.assertEqual(self.resolver.resolve('tylenol'), 'Acetaminophen')
+
+    def test_close_names_are_not_resolved(self):
+        self.assertIsNone(self.resolver.resolve('insulin'))
+        self.assertIsNone(self.resolver.resolve('metfromin'))
+
+    def test_misspelling_is_only_suggested(self):
+        names = [result['name'] for result in self.resolver.search('metfromin', limit=1)]
+        self.assertEqual(names, ['Metformin'])
+
+    def test_search_returns_prefix_matches_first(self):
+        names = [result['name'] for result in self.resolver.search('met', limit=2)]
+        self.assertEqual(sorted(names), ['Metformin', 'Methadone'])
+
+
+class FakeClassifier:
+    """Stands in for the random forest: a deterministic severity per feature row, counting calls."""
+
+    def __init__(self):
+        self.calls = []
+
+    def predict(self, features):
+        self.calls.append(len(features))
+        return (np.abs(features).sum(axis=1) * 1000).astype(np.int64) % 4
+
+
+class InteractionPredictionTest(SimpleTestCase):
+    DRUGS = ['Perampanel', 'Chloroprocaine', 'Fenoldopam', 'Prazosin']
+
+    def setUp(self):
+        self.classifier = FakeClassifier()
+        for patcher in (
+            mock.patch.object(interactions, 'get_classifier', return_value=self.classifier),
+            mock.patch.object(interactions, 'interaction_table', None),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_batched_prediction_matches_pairwise_prediction(self):
+        drugs = self.DRUGS[:3] + ['Not a drug']
+        warnings = interactions.predict_interactions(drugs, 'Prazosin')
+        self.assertEqual(self.classifier.calls, [3])
+        self.assertEqual(warnings, {drug: interactions.predict_interaction(drug, 'Prazosin') for drug in self.DRUGS[:3]})
+        self.assertEqual(interactions.predict_interactions(drugs, 'Not a drug'), {})
+
+
+class RegimenReportTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.classifier = FakeClassifier()
+        for patcher in (
+            mock.patch.object(interactions, 'get_classifier', return_value=self.classifier),
+            mock.patch.object(interactions, 'interaction_table', None),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_report_covers_every_pair_of_the_normalized_regimen(self):
+        report = interactions.regimen_interaction_report(['PRAZOSIN', 'Fenoldopam', ' prazosin ', 'Perampanel', 'Unknown-ium'])
+        drugs = ['Fenoldopam', 'Perampanel', 'Prazosin', 'unknown ium']
+        self.assertEqual(report['medications'], drugs)
+        self.assertEqual(report['unknown_medications'], ['unknown ium'])
+        self.assertEqual(self.classifier.calls, [6])
+
+        matrix = report['matrix']
+        for i, row_drug in enumerate(drugs):
+            for j, col_drug in enumerate(drugs):
+                if i == j or 'unknown ium' in (row_drug, col_drug):
+                    self.assertIsNone(matrix[i][j])
+                else:
+                    expected = interactions.predict_severities([interactions.drug_index[row_drug]], [interactions.drug_index[col_drug]])
+                    self.assertEqual(matrix[i][j], int(expected[0]))
+
+        expected_pairs = [
+            (drugs[i], drugs[j], max(matrix[i][j], matrix[j][i]))
+            for i in range(3) for j in range(i + 1, 3) if max(matrix[i][j], matrix[j][i]) > 0
+        ]
+        pairs = [(item['drug_a'], item['drug_b'], item['severity']) for item in report['interactions']]
+        self.assertEqual(sorted(pairs), sorted(expected_pairs))
+        self.assertEqual([item[2] for item in pairs], sorted((item[2] for item in pairs), reverse=True))
+
+    def test_equal_regimens_share_one_cached_report(self):
+        first = interactions.regimen_interaction_report(['Prazosin', 'Fenoldopam'])
+        second = interactions.regimen_interaction_report(['fenoldopam', 'PRAZOSIN', 'Prazosin'])
+        self.assertEqual(second, first)
+        self.assertEqual(self.classifier.calls, [2])
+
+
+class InteractionTableTest(TestCase):
+    def setUp(self):
+        self.classifier = FakeClassifier()
+        patcher = mock.patch.object(interactions, 'get_classifier', return_value=self.classifier)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.output = os.path.join(tempfile.mkdtemp(), 'interaction_table.npy')
+        self.addCleanup(shutil.rmtree, os.path.dirname(self.output))
+
+    def test_precomputed_pairs_skip_the_classifier(self):
+        user = get_user_model().objects.create_user(email='table@example.com', password='password123', first_name='T', last_name='U')
+        for name in ('Prazosin', 'Prazosin', 'Fenoldopam'):
+            Medication.objects.create(user=user, medication_name=name, dosage_quantity_of_units_per_time=1,
+                                      dosage_frequency=1, first_time_of_intake=timezone.now())
+        with mock.patch('medication.management.commands.precompute_interactions.get_classifier',
+                        return_value=self.classifier):
+            call_command('precompute_interactions', top_n=2, output=self.output, stdout=StringIO())
+
+        table = interactions.load_interaction_table(self.output)
+        prazosin, fenoldopam, perampanel = (interactions.drug_index[name] for name in ('Prazosin', 'Fenoldopam', 'Perampanel'))
+        self.assertEqual(int(table[prazosin, perampanel]), interactions.UNCACHED_SEVERITY)
+
+        a_indices, b_indices = [prazosin, fenoldopam, prazosin], [fenoldopam, prazosin, perampanel]
+        expected = self.classifier.predict(interactions.build_features(a_indices, b_indices))
+        self.classifier.calls.clear()
+        with mock.patch.object(interactions, 'interaction_table', table):
+            np.testing.assert_array_equal(interactions.predict_severities(a_indices, b_indices), expected)
+        # Only the pair outside the table went to the model
+        self.assertEqual(self.classifier.calls, [1])
+
+
+class ScheduleEngineTest(SimpleTestCase):
+    start = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+
+    def medication(self, **kwargs):
+        defaults = {
+            'medication_name': 'Metformin',
+            'dosage_quantity_of_units_per_time': 1,
+            'dosage_frequency': 2,
+            'periodic_interval': 'daily',
+            'first_time_of_intake': self.start - timedelta(days=3, hours=-8),
+        }
+        defaults.update(kwargs)
+        return Medication(**defaults)
+
+    def test_doses_follow_the_interval_grid(self):
+        doses = get_scheduled_doses([self.medication()], self.start, self.start + timedelta(days=1))
+        self.assertEqual([dose for _, dose in doses], [self.start + timedelta(hours=8), self.start + timedelta(hours=20)])
+
+    def test_window_respects_first_intake_and_stop(self):
+        medication = self.medication(
+            first_time_of_intake=self.start + timedelta(hours=8),
+            stopped_by_datetime=self.start + timedelta(days=1, hours=8),
+        )
+        doses = get_scheduled_doses([medication], self.start, self.start + timedelta(days=7))
+        self.assertEqual(len(doses), 3)
+
+    def test_many_medications_match_a_step_by_step_schedule(self):
+        medications = [
+            self.medication(dosage_frequency=1 + i % 4, periodic_interval=('daily', 'weekly', 'monthly')[i % 3])
+            for i in range(500)
+        ]
+        window_end = self.start + timedelta(days=30)
+        doses = get_scheduled_doses(medications, self.start, window_end)
+
+        expected = []
+        for medication in medications:
+            spacing = timedelta(seconds=dose_spacing_seconds(medication))
+            dose_time = medication.first_time_of_intake
+            while dose_time < window_end:
+                if dose_time >= self.start:
+                    expected.append((id(medication), dose_time))
+                dose_time += spacing
+        self.assertEqual(sorted((id(med), dose) for med, dose in doses), sorted(expected))
+        self.assertEqual([dose for _, dose in doses], sorted(dose for _, dose in doses))
+
+
+class MedicationCalendarTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(email='calendar@example.com', password='password123', first_name='Test', last_name='User')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        first_intake = datetime(2026, 10, 30, 12, tzinfo=dt_timezone.utc)
+        self.medication = Medication.objects.create(
+            user=self.user, medication_name='Metformin', dosage_quantity_of_units_per_time=1,
+            dosage_frequency=2, first_time_of_intake=first_intake,
+        )
+        # Stopped before the range, so it has no doses in it
+        Medication.objects.create(
+            user=self.user, medication_name='Aspirin', dosage_quantity_of_units_per_time=1, dosage_frequency=1,
+            first_time_of_intake=first_intake - timedelta(days=5), stopped_by_datetime=first_intake,
+        )
+
+    def calendar(self, start, end):
+        return self.client.get('/medication/calendar/', {'start': start, 'end': end}, HTTP_USER_TIMEZONE='America/New_York')
+
+    def test_local_days_across_a_dst_change(self):
+        response = self.calendar('2026-10-31', '2026-11-01')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(entry['medication_id'], entry['date'], entry['scheduled_time']) for entry in response.data],
+            [
+                (self.medication.id, '2026-10-31', '2026-10-31T08:00:00-04:00'),
+                (self.medication.id, '2026-10-31', '2026-10-31T20:00:00-04:00'),
+                (self.medication.id, '2026-11-01', '2026-11-01T07:00:00-05:00'),
+                (self.medication.id, '2026-11-01', '2026-11-01T19:00:00-05:00'),
+            ],
+        )
+
+    def test_invalid_ranges_are_rejected(self):
+        self.assertEqual(self.calendar('2026-11-02', '2026-11-01').status_code, 400)
+        self.assertEqual(self.calendar('2026-01-01', '2026-12-31').status_code, 400)
+        self.assertEqual(self.calendar('2026-11-01', '').status_code, 400)
+
+
+class FailingTransport:
+    def send_multicast(self, tokens, title, body, data=None):
+        raise ConnectionError('push service unavailable')
+
+
+class PartiallyFailingTransport(LocalTransport):
+    """Accepts the message but reports some tokens as undeliverable, like FCM does."""
+
+    def __init__(self, failing_tokens):
+        super().__init__()
+        self.failing_tokens = set(failing_tokens)
+
+    def send_multicast(self, tokens, title, body, data=None):
+        super().send_multicast(tokens, title, body, data)
+        return [token for token in tokens if token in self.failing_tokens]
+
+
+@override_settings(MEDICATION_REMINDER_TRANSPORT='medication.reminders.LocalTransport')
+class ReminderDispatcherTest(TestCase):
+    def setUp(self):
+        self.transport = LocalTransport()
+        users = [
+            get_user_model().objects.create_user(email=f'user{i}@example.com', password='password123', first_name='Test', last_name='User')
+            for i in range(2)
+        ]
+        first_intake = timezone.now().replace(microsecond=0) + timedelta(minutes=30)
+        for i, user in enumerate(users):
+            Device.objects.create(user=user, device_token=f'token-{i}')
+            # Saving the medication materializes its upcoming reminders
+            Medication.objects.create(
+                user=user, medication_name='Metformin', dosage_quantity_of_units_per_time=1,
+                dosage_frequency=2, first_time_of_intake=first_intake,
+            )
+        self.due_time = first_intake
+
+    def test_due_doses_are_sent_once_in_one_multicast(self):
+        self.assertEqual(ScheduledDose.objects.filter(scheduled_time=self.due_time).count(), 2)
+
+        self.assertEqual(dispatch_due_doses(now=self.due_time, transport=self.transport), 2)
+        self.assertEqual(len(self.transport.outbox), 1)
+        self.assertEqual(self.transport.outbox[0]['tokens'], ['token-0', 'token-1'])
+
+        # A second run (or a concurrent dispatcher) finds nothing left to send
+        self.assertEqual(dispatch_due_doses(now=self.due_time, transport=self.transport), 0)
+        self.assertEqual(len(self.transport.outbox), 1)
+        self.assertEqual(ScheduledDose.objects.filter(scheduled_time=self.due_time, status='sent').count(), 2)
+
+    def test_failed_sends_are_retried_with_backoff(self):
+        self.assertEqual(dispatch_due_doses(now=self.due_time, transport=FailingTransport()), 0)
+        due = ScheduledDose.objects.filter(scheduled_time=self.due_time)
+        self.assertEqual(set(due.values_list('status', 'attempts')), {('pending', 1)})
+
+        # Not retried before the backoff has passed
+        self.assertEqual(dispatch_due_doses(now=self.due_time, transport=self.transport), 0)
+        retry_time = self.due_time + timedelta(minutes=1)
+        self.assertEqual(dispatch_due_doses(now=retry_time, transport=self.transport), 2)
+        self.assertEqual(set(due.values_list('status', flat=True)), {'sent'})
+
+    def test_only_doses_of_undelivered_tokens_are_retried(self):
+        transport = PartiallyFailingTransport({'token-1'})
+        self.assertEqual(dispatch_due_doses(now=self.due_time, transport=transport), 1)
+        due = ScheduledDose.objects.filter(scheduled_time=self.due_time)
+        self.assertEqual(
+            dict(due.values_list('user__email', 'status')),
+            {'user0@example.com': 'sent', 'user1@example.com': 'pending'},
+        )
+
+        retry_time = self.due_time + timedelta(minutes=1)
+        self.assertEqual(dispatch_due_doses(now=retry_time, transport=self.transport), 1)
+        self.assertEqual(self.transport.outbox[0]['tokens'], ['token-1'])
+
+    def test_doses_are_marked_failed_after_max_attempts(self):
+        now = self.due_time
+        for _ in range(3):
+            dispatch_due_doses(now=now, transport=FailingTransport())
+            now += timedelta(minutes=4)
+        due = ScheduledDose.objects.filter(scheduled_time=self.due_time)
+        self.assertEqual(set(due.values_list('status', 'attempts')), {('failed', 3)})
+
+
+class AdherenceTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(email='adherence@example.com', password='password123', first_name='Test', last_name='User')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        now = timezone.now().replace(microsecond=0)
+        # Once a day for the last 10 days (the dose 10 days ago is outside the 7-day window)
+        self.medication = Medication.objects.create(
+            user=self.user, medication_name='Metformin', dosage_quantity_of_units_per_time=1,
+            dosage_frequency=1, first_time_of_intake=now - timedelta(days=10, hours=-1),
+        )
+        self.dose_times = [dose for _, dose in get_scheduled_doses([self.medication], now - timedelta(days=7), now)]
+
+    def test_adherence_counts_missing_records_as_missed(self):
+        for dose_time, status in zip(self.dose_times, ['taken', 'taken', 'late', 'skipped']):
+            response = self.client.post('/medication/doses/', {
+                'medication': self.medication.id, 'scheduled_time': dose_time.isoformat(), 'status': status,
+            }, format='json')
+            self.assertEqual(response.status_code, 201)
+        self.assertEqual(DoseEvent.objects.count(), 4)
+
+        # Recording a dose again corrects the existing event
+        response = self.client.post('/medication/doses/', {
+            'medication': self.medication.id, 'scheduled_time': self.dose_times[3].isoformat(), 'status': 'late',
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['status'], 'late')
+        self.assertEqual(DoseEvent.objects.count(), 4)
+        self.client.post('/medication/doses/', {
+            'medication': self.medication.id, 'scheduled_time': self.dose_times[3].isoformat(), 'status': 'skipped',
+        }, format='json')
+
+        response = self.client.get('/medication/adherence/')
+        week = response.data['overall']['7d']
+        self.assertEqual(week['scheduled'], 7)
+        self.assertEqual((week['taken'], week['late'], week['skipped']), (2, 1, 1))
+        self.assertEqual(week['adherence'], round(3 / 7, 4))
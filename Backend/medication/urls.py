@@ -13,7 +13,14 @@ urlpatterns = [
     path('delete/<int:primary_key>/', views.delete_medication, name='delete_medication'),
     path('active_medications/', views.get_active_medications, name='get_active_medications'),
     path('today_upcoming/', views.get_todays_upcoming_medications, name='get_todays_upcoming_medications'),
+    path('schedule/', views.get_medication_schedule, name='get_medication_schedule'),
+    path('calendar/', views.get_medication_calendar, name='get_medication_calendar'),
     path('medication_day/', views.get_medications_on_day, name='get_medications_on_day'),
+    path('drugs/search/', views.search_drugs, name='search_drugs'),
+    path('interactions/', views.get_regimen_interactions, name='get_regimen_interactions'),
+    path('devices/', views.register_device, name='register_device'),
+    path('doses/', views.record_dose_event, name='record_dose_event'),
+    path('adherence/', views.get_adherence, name='get_adherence'),
 
 ]
 
@@ -1,6 +1,95 @@
 from django.utils import timezone
 import datetime
 from datetime import timedelta
+import numpy as np
+
+# Length of each periodic interval in seconds (a month is approximated as 30 days)
+INTERVAL_SECONDS = {
+    'daily': 24 * 60 * 60,
+    'weekly': 7 * 24 * 60 * 60,
+    'monthly': 30 * 24 * 60 * 60,
+}
+
+EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def dose_spacing_seconds(medication):
+    """Seconds between two consecutive doses (doses are equally distributed over the interval), or None."""
+    interval_seconds = INTERVAL_SECONDS.get((medication.periodic_interval or '').lower())
+    if not interval_seconds or not medication.dosage_frequency or medication.dosage_frequency <= 0:
+        return None
+    return interval_seconds / medication.dosage_frequency
+
+
+def get_scheduled_doses(medications, window_start, window_end):
+    """
+    Calculate every scheduled dose of many medications within [window_start, window_end).
+
+    Doses of a medication lie on the grid first_time_of_intake + k * spacing
+    (k >= 0), so the doses inside the window are found with arithmetic on k
+    for all medications at once instead of walking interval cycles.
+    Doses after stopped_by_datetime are dropped.
+    Returns a list of (medication, dose_time) pairs sorted by dose time; dose
+    times are timezone-aware UTC datetimes.
+    """
+    medications = list(medications)
+    scheduled, med_idx, dose_us = _dose_grid(medications, window_start, window_end)
+    order = np.argsort(dose_us, kind='stable')
+
+    return [
+        (scheduled[i], EPOCH + timedelta(microseconds=int(us)))
+        for i, us in zip(med_idx[order], dose_us[order])
+    ]
+
+
+def count_scheduled_doses(medications, window_start, window_end):
+    """Number of scheduled doses of each medication within [window_start, window_end), as a list."""
+    medications = list(medications)
+    scheduled, med_idx, _ = _dose_grid(medications, window_start, window_end)
+    positions = {id(med): i for i, med in enumerate(scheduled)}
+    counts = np.bincount(med_idx, minlength=len(scheduled))
+    return [int(counts[positions[id(med)]]) if id(med) in positions else 0 for med in medications]
+
+
+def _dose_grid(medications, window_start, window_end):
+    """Flat arrays (medication position, dose time in epoch microseconds) of the doses in the window.
+
+    Positions refer to the returned list of schedulable medications.
+    """
+    scheduled = [(med, dose_spacing_seconds(med)) for med in medications]
+    scheduled = [(med, spacing) for med, spacing in scheduled if spacing]
+    empty = ([med for med, _ in scheduled], np.zeros(0, dtype=np.int64), np.zeros(0))
+    if not scheduled:
+        return empty
+
+    start = window_start.timestamp()
+    end = window_end.timestamp()
+    first = np.array([med.first_time_of_intake.timestamp() for med, _ in scheduled])
+    spacing = np.array([spacing for _, spacing in scheduled])
+    stop = np.array([
+        med.stopped_by_datetime.timestamp() if med.stopped_by_datetime else np.inf
+        for med, _ in scheduled
+    ])
+
+    # Candidate k range per medication, widened by one step so float rounding at
+    # the window edges cannot drop a dose; the exact bounds are applied below.
+    last_time = np.minimum(end, stop)
+    k_low = np.maximum(np.floor((start - first) / spacing), 0)
+    k_high = np.floor((last_time - first) / spacing) + 1
+    counts = np.maximum(k_high - k_low + 1, 0).astype(np.int64)
+    if counts.sum() == 0:
+        return empty
+
+    # Expand the per-medication ranges into one flat array of doses
+    med_idx = np.repeat(np.arange(len(scheduled)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    k = k_low[med_idx] + offsets
+    # Same microsecond rounding as first_time_of_intake + timedelta(seconds=k * spacing)
+    dose_us = np.rint((first[med_idx] + k * spacing[med_idx]) * 1e6)
+
+    keep = (dose_us >= np.rint(start * 1e6)) & (dose_us < np.rint(end * 1e6)) & (dose_us <= np.rint(stop[med_idx] * 1e6))
+    return [med for med, _ in scheduled], med_idx[keep], dose_us[keep]
+
 
 def get_todays_scheduled_doses(medication, today_start, today_end):
     """
@@ -8,65 +97,4 @@ def get_todays_scheduled_doses(medication, today_start, today_end):
     Assumes doses are equally distributed throughout the day.
     All calculations are done in UTC, and the function expects timezone-aware datetimes.
     """
-    doses = []
-    
-    # Skip if medication has no dosage frequency
-    if not medication.dosage_frequency or medication.dosage_frequency <= 0:
-        return doses
-    
-    # Get the base interval in minutes
-    if medication.periodic_interval.lower() == 'daily':
-        interval_minutes = 24 * 60  # 1440 minutes
-    elif medication.periodic_interval.lower() == 'weekly':
-        interval_minutes = 7 * 24 * 60  # 10080 minutes
-    elif medication.periodic_interval.lower() == 'monthly':
-        interval_minutes = 30 * 24 * 60  # 43200 minutes (approximate)
-    else:
-        return doses
-    
-    # Calculate time between doses (equally distributed)
-    dose_spacing_minutes = interval_minutes / medication.dosage_frequency
-    
-    # Find the medication's first intake time (it's already in UTC)
-    first_intake = medication.first_time_of_intake
-
-    # The start and end times are already in UTC, no need for conversion.
-    
-    # Calculate how many complete intervals have passed since first intake
-    time_since_first = (today_start - first_intake).total_seconds() / 60  # in minutes
-    
-    if time_since_first < 0:
-        # Medication starts in the future, check if it starts today
-        if first_intake <= today_end:
-            # Calculate doses starting from first_intake
-            for i in range(medication.dosage_frequency):
-                dose_time = first_intake + timedelta(minutes=i * dose_spacing_minutes)
-                if today_start <= dose_time < today_end:
-                    doses.append(dose_time)
-    else:
-        # Medication started in the past, calculate today's doses
-        complete_intervals = int(time_since_first // interval_minutes)
-        
-        # Calculate the start of the current interval cycle
-        current_cycle_start = first_intake + timedelta(minutes=complete_intervals * interval_minutes)
-        
-        # Generate doses for the current cycle that fall within today
-        for i in range(medication.dosage_frequency):
-            dose_time = current_cycle_start + timedelta(minutes=i * dose_spacing_minutes)
-            if today_start <= dose_time < today_end:
-                doses.append(dose_time)
-        
-        # Also check if the next cycle starts today
-        next_cycle_start = current_cycle_start + timedelta(minutes=interval_minutes)
-        if next_cycle_start < today_end:
-            for i in range(medication.dosage_frequency):
-                dose_time = next_cycle_start + timedelta(minutes=i * dose_spacing_minutes)
-                if today_start <= dose_time < today_end:
-                    doses.append(dose_time)
-    
-    # Filter out doses that are after the medication was stopped
-    if medication.stopped_by_datetime:
-        stopped_time = medication.stopped_by_datetime
-        doses = [dose for dose in doses if dose <= stopped_time]
-    
-    return sorted(doses)
\ No newline at end of file
+    return [dose_time for _, dose_time in get_scheduled_doses([medication], today_start, today_end)]
@@ -1,14 +1,14 @@
 #medication/view.py
 
 from django.http import JsonResponse
-from .models import Medication
-from .serializers import MedicationSerializer
+from .models import Medication, Device, DoseEvent
+from .serializers import MedicationSerializer, DeviceSerializer, DoseEventSerializer
+from django.db.models import Count
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from django.conf import settings
-import joblib
 import numpy as np
 import json
 from drf_yasg import openapi
@@ -16,41 +16,11 @@ from django.db.models import Q
 from django.utils import timezone
 from datetime import timedelta, time ,datetime
 from dateutil import parser
-from .utils import get_todays_scheduled_doses
+from .utils import get_scheduled_doses, count_scheduled_doses
+from .interactions import predict_interactions, drug_name_resolver, regimen_interaction_report
+from accounts.middleware import local_day_bounds
 import pytz
 
-#Load model and matrices
-clf = joblib.load(settings.DRUG_INTERACTION_MODEL_PATH)
-u = np.load(settings.U_MATRIX_PATH)
-vt = np.load(settings.VT_MATRIX_PATH)
-drug_index = np.load(settings.DRUG_INDEX_PATH, allow_pickle=True).item()
-
-# Severity Mapping for drug interactions
-severity_messages = {
-    3: "Major interaction: Serious side effects may occur. Consult a healthcare provider.",
-    2: "Moderate interaction: Potential interactions. Seek medical advice if needed.",
-    1: "Minor interaction: Minimal effects expected.",
-    0: "No known interaction."
-}
-
-# Function to preprocess input data for drug interaction prediction
-def preprocess_input(drug_a, drug_b):
-    """Prepare input features for prediction."""
-    idx1 = drug_index.get(drug_a)
-    idx2 = drug_index.get(drug_b)
-    if idx1 is None or idx2 is None:
-        return None
-    return np.concatenate([u[idx1], vt[idx2]])
-
-# Function to predict the severity of a drug interaction
-def predict_interaction(drug_a, drug_b):
-    """Predict severity of drug interaction."""
-    features = preprocess_input(drug_a, drug_b)
-    if features is None:
-        return None
-    severity_prediction = clf.predict([features])[0]
-    return severity_messages.get(severity_prediction, "Unknown interaction level.")
-
 # Function to format medication name
 def format_medication_name(name):
     return name.strip().lower().capitalize() if name else name
@@ -92,11 +62,10 @@ def create_medication(request):
         Q(stopped_by_datetime__gte=current_time) | Q(stopped_by_datetime__isnull=True)
     )
     
-    for med in existing_medications:
-        existing_med_name = format_medication_name(med.medication_name)
-        interaction_result = predict_interaction(existing_med_name, medication_name)
-        if interaction_result:
-            interaction_warnings[med.medication_name] = interaction_result
+    # One batched prediction for all active medications
+    existing_names = {format_medication_name(med.medication_name): med.medication_name for med in existing_medications}
+    for existing_med_name, interaction_result in predict_interactions(existing_names, medication_name).items():
+        interaction_warnings[existing_names[existing_med_name]] = interaction_result
 
     first_time = parse_datetime_safe(data.get('first_time_of_intake'))
     stopped_time = parse_datetime_safe(data.get('stopped_by_datetime'))
@@ -142,10 +111,8 @@ def update_medication(request, primary_key):
         Q(stopped_by_datetime__gte=current_time) | Q(stopped_by_datetime__isnull=True)
     )
 
-    for med in existing_medications:
-        interaction_result = predict_interaction(med.medication_name, medication_name)
-        if interaction_result:
-            interaction_warnings[med.medication_name] = interaction_result
+    existing_names = existing_medications.values_list('medication_name', flat=True)
+    interaction_warnings.update(predict_interactions(existing_names, medication_name))
 
     # Parse datetime fields safely using your function
     first_time = parse_datetime_safe(data.get('first_time_of_intake'))
@@ -243,13 +210,28 @@ def get_medications_on_day(request):
     except ValueError:
         return Response({'error': 'Invalid date format. Use YYYY-MM-DD.'}, status=400)
 
-    medications = Medication.objects.filter(user=request.user).filter(
-        Q(first_time_of_intake__lte=date) & Q(stopped_by_datetime__gte=date)
-    )
-    serializer = MedicationSerializer(medications, many=True)
+    # The requested day in the user's timezone, as a UTC range
+    user_tz = request.user_timezone
+    _, day_start_utc, day_end_utc = local_day_bounds(user_tz, date.date())
+
+    medications = active_medications_between(request.user, day_start_utc, day_end_utc)
+    serializer = MedicationSerializer(medications, many=True, context={'user_timezone': user_tz})
     return Response(serializer.data)
 
 
+def active_medications_between(user, start_utc, end_utc):
+    """Medications with possible doses in [start_utc, end_utc), including open-ended ones.
+
+    Backed by the (user, first_time_of_intake, stopped_by_datetime) index.
+    """
+    return Medication.objects.filter(
+        user=user,
+        first_time_of_intake__lt=end_utc
+    ).filter(
+        Q(stopped_by_datetime__isnull=True) | Q(stopped_by_datetime__gte=start_utc)
+    )
+
+
 
 upcoming_medication_response = openapi.Schema(
     type=openapi.TYPE_OBJECT,
@@ -280,19 +262,9 @@ upcoming_medication_response = openapi.Schema(
 def get_todays_upcoming_medications(request):
     """Return today's medications with upcoming dose times after the current time."""
     user_tz = request.user_timezone
-    user_now = timezone.now().astimezone(user_tz)
-    
-    # Get the start and end of the user's current day
-    user_today_start = user_now.replace(hour=0, minute=0, second=0, microsecond=0)
-    user_today_end = user_today_start + timedelta(days=1)
-    
-    # Convert to UTC for database queries
-    today_start_utc = user_today_start.astimezone(pytz.UTC)
-    today_end_utc = user_today_end.astimezone(pytz.UTC)
-
-    # Get the current time in user's timezone, then convert to UTC for comparison
-    user_now = timezone.now().astimezone(user_tz)
-    now_utc = user_now.astimezone(pytz.UTC)
+    # The user's local today as a UTC range
+    _, today_start_utc, today_end_utc = request.local_day
+    now_utc = timezone.now()
 
     # Filter active medications that could have doses today
     medications = Medication.objects.filter(
@@ -302,35 +274,251 @@ def get_todays_upcoming_medications(request):
         Q(stopped_by_datetime__isnull=True) | Q(stopped_by_datetime__gte=today_start_utc)  # Not stopped or stopped after today started
     )
 
-    upcoming_medications = []
-
-    for med in medications:
-        # Get today's scheduled dose times in UTC
-        todays_doses_utc = get_todays_scheduled_doses(med, today_start_utc, today_end_utc)
-        
-        # Filter for upcoming doses only (after current time in user's timezone)
-        upcoming_doses_utc = [dose_time for dose_time in todays_doses_utc if dose_time > now_utc]
-        
-        # Create a response entry for each upcoming dose
-        for dose_time_utc in upcoming_doses_utc:
-            # Convert dose time to user's timezone for display
-            dose_time_user = dose_time_utc.astimezone(user_tz)
-            
-            medication_entry = {
-                'medication_name': med.medication_name,
-                'route_of_administration': med.route_of_administration,
-                'dosage_form': med.dosage_form,
-                'dosage_quantity_of_units_per_time': float(med.dosage_quantity_of_units_per_time),
-                'time_for_intake': dose_time_user.strftime('%I:%M %p'),  # 12-hour format
-                '_sort_time': dose_time_utc  # For sorting purposes
-            }
-            upcoming_medications.append(medication_entry)
-
-    # Sort medications by their dose time
-    upcoming_medications.sort(key=lambda med: med['_sort_time'])
-    
-    # Remove the sorting helper field before returning
-    for med in upcoming_medications:
-        del med['_sort_time']
+    # Only doses after the current time, already sorted by dose time
+    upcoming_doses = get_scheduled_doses(medications, max(today_start_utc, now_utc + timedelta(microseconds=1)), today_end_utc)
+
+    upcoming_medications = [
+        {
+            'medication_name': med.medication_name,
+            'route_of_administration': med.route_of_administration,
+            'dosage_form': med.dosage_form,
+            'dosage_quantity_of_units_per_time': float(med.dosage_quantity_of_units_per_time),
+            'time_for_intake': dose_time_utc.astimezone(user_tz).strftime('%I:%M %p'),  # 12-hour format
+        }
+        for med, dose_time_utc in upcoming_doses
+    ]
+
+    return Response(upcoming_medications)
+
+
+# Length of the calendar views served by get_medication_schedule
+SCHEDULE_PERIODS = {'week': 7, 'month': 30}
+
+def dose_entries(doses, user_tz):
+    """Response rows for (medication, dose_time) pairs, in the user's timezone."""
+    entries = []
+    for med, dose_time in doses:
+        local_time = dose_time.astimezone(user_tz)
+        entries.append({
+            'medication_id': med.id,
+            'medication_name': med.medication_name,
+            'route_of_administration': med.route_of_administration,
+            'dosage_form': med.dosage_form,
+            'dosage_quantity_of_units_per_time': float(med.dosage_quantity_of_units_per_time),
+            'date': local_time.date().isoformat(),
+            'scheduled_time': local_time.isoformat(),
+        })
+    return entries
+
+
+@swagger_auto_schema(
+    method='get',
+    manual_parameters=[
+        openapi.Parameter('period', openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=list(SCHEDULE_PERIODS),
+                          description='Calendar length starting today (default: week)'),
+    ],
+    responses={200: 'List of scheduled doses sorted by time'}
+)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_medication_schedule(request):
+    """Return every scheduled dose for the coming week or month, starting at the beginning of today."""
+    period = request.query_params.get('period', 'week')
+    if period not in SCHEDULE_PERIODS:
+        return Response({'error': f"period must be one of: {', '.join(SCHEDULE_PERIODS)}"}, status=400)
+
+    user_tz = request.user_timezone
+    today = request.local_day
+    start_utc = today.start
+    end_utc = local_day_bounds(user_tz, today.date + timedelta(days=SCHEDULE_PERIODS[period] - 1)).end
+
+    medications = active_medications_between(request.user, start_utc, end_utc)
+    return Response(dose_entries(get_scheduled_doses(medications, start_utc, end_utc), user_tz))
+
+
+# Longest range served by get_medication_calendar, in days
+MAX_CALENDAR_DAYS = 92
+
+@swagger_auto_schema(
+    method='get',
+    manual_parameters=[
+        openapi.Parameter('start', openapi.IN_QUERY, type=openapi.TYPE_STRING, required=True, description='First day (YYYY-MM-DD, user timezone)'),
+        openapi.Parameter('end', openapi.IN_QUERY, type=openapi.TYPE_STRING, required=True, description='Last day, inclusive (YYYY-MM-DD, user timezone)'),
+    ],
+    responses={200: 'List of scheduled doses in the range sorted by time', 400: 'Bad Request'}
+)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_medication_calendar(request):
+    """Return every scheduled dose between two local dates (inclusive) in one call."""
+    try:
+        start_date = datetime.strptime(request.query_params.get('start', ''), '%Y-%m-%d').date()
+        end_date = datetime.strptime(request.query_params.get('end', ''), '%Y-%m-%d').date()
+    except ValueError:
+        return Response({'error': 'start and end are required. Use YYYY-MM-DD.'}, status=400)
+
+    if end_date < start_date:
+        return Response({'error': 'end must not be before start.'}, status=400)
+    if (end_date - start_date).days >= MAX_CALENDAR_DAYS:
+        return Response({'error': f'The range cannot exceed {MAX_CALENDAR_DAYS} days.'}, status=400)
+
+    user_tz = request.user_timezone
+    start_utc = local_day_bounds(user_tz, start_date).start
+    end_utc = local_day_bounds(user_tz, end_date).end
+
+    medications = active_medications_between(request.user, start_utc, end_utc)
+    return Response(dose_entries(get_scheduled_doses(medications, start_utc, end_utc), user_tz))
+
+
+# Drug-name autocomplete backed by the interaction checker's name index
+@swagger_auto_schema(
+    method='get',
+    manual_parameters=[
+        openapi.Parameter('q', openapi.IN_QUERY, type=openapi.TYPE_STRING, required=True, description='Partial or misspelled drug name'),
+        openapi.Parameter('limit', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description='Maximum number of suggestions (default 10, max 50)'),
+    ],
+    responses={200: 'List of {name, confidence} suggestions'}
+)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def search_drugs(request):
+    """Suggest known drug names for a partial, brand or misspelled name."""
+    query = request.query_params.get('q', '')
+    if not query.strip():
+        return Response({'error': 'q parameter is required'}, status=400)
+
+    try:
+        limit = min(max(int(request.query_params.get('limit', 10)), 1), 50)
+    except ValueError:
+        return Response({'error': 'limit must be an integer'}, status=400)
+
+    return Response(drug_name_resolver.search(query, limit=limit))
+
+
+
+# Interaction report for the user's whole active regimen
+@swagger_auto_schema(method='get', responses={200: 'Severity matrix and interacting pairs for all active medications'})
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_regimen_interactions(request):
+    """Check every pair of the user's active medications against each other."""
+    current_time = timezone.now()
+    medication_names = Medication.objects.filter(
+        user=request.user
+    ).filter(
+        Q(stopped_by_datetime__gte=current_time) | Q(stopped_by_datetime__isnull=True)
+    ).values_list('medication_name', flat=True)
+
+    return Response(regimen_interaction_report(medication_names))
+
+
+
+# Register the device that should receive medication reminders
+@swagger_auto_schema(method='post', request_body=DeviceSerializer, responses={201: DeviceSerializer, 400: 'Bad Request'})
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def register_device(request):
+    """Register (or move to the current user) a push notification token."""
+    serializer = DeviceSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=400)
+
+    device, _ = Device.objects.update_or_create(
+        device_token=serializer.validated_data['device_token'],
+        defaults={'user': request.user, 'platform': serializer.validated_data.get('platform', 'android')},
+    )
+    return Response(DeviceSerializer(device).data, status=201)
+
+
+
+# Record whether a scheduled dose was taken, taken late or skipped
+@swagger_auto_schema(method='post', request_body=DoseEventSerializer,
+                     responses={200: DoseEventSerializer, 201: DoseEventSerializer, 400: 'Bad Request'})
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def record_dose_event(request):
+    """Record (201) or correct (200) the outcome of one scheduled dose."""
+    serializer = DoseEventSerializer(data=request.data, context={'request': request})
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=400)
+
+    data = serializer.validated_data
+    event, created = DoseEvent.objects.update_or_create(
+        medication=data['medication'],
+        scheduled_time=data['scheduled_time'],
+        defaults={
+            'user': request.user,
+            'status': data['status'],
+            'recorded_at': data.get('recorded_at', timezone.now()),
+        },
+    )
+    return Response(DoseEventSerializer(event).data, status=201 if created else 200)
+
+
+# Windows (days) reported by get_adherence
+ADHERENCE_WINDOWS = (7, 30, 90)
+
+def adherence_summary(scheduled, taken, late, skipped):
+    """Counts and adherence rate (taken or late / scheduled) of one window."""
+    return {
+        'scheduled': scheduled,
+        'taken': taken,
+        'late': late,
+        'skipped': skipped,
+        'adherence': round(min(taken + late, scheduled) / scheduled, 4) if scheduled else None,
+    }
+
+
+@swagger_auto_schema(method='get', responses={200: 'Per-medication and overall adherence over 7, 30 and 90 days'})
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_adherence(request):
+    """Adherence rates per medication and overall.
+
+    Recorded outcomes are counted with one aggregate query; the number of
+    scheduled doses comes from the schedule engine, so doses without any
+    record count as missed.
+    """
+    now = timezone.now()
+    window_starts = {days: now - timedelta(days=days) for days in ADHERENCE_WINDOWS}
+    longest_start = window_starts[max(ADHERENCE_WINDOWS)]
+
+    medications = list(active_medications_between(request.user, longest_start, now))
+
+    aggregates = {}
+    for days, start in window_starts.items():
+        for status in ('taken', 'late', 'skipped'):
+            aggregates[f'{status}_{days}'] = Count(
+                'id', filter=Q(status=status, scheduled_time__gte=start)
+            )
+    events = {
+        row['medication_id']: row
+        for row in DoseEvent.objects.filter(
+            user=request.user, scheduled_time__gte=longest_start, scheduled_time__lt=now
+        ).values('medication_id').annotate(**aggregates)
+    }
+
+    scheduled_counts = {
+        days: count_scheduled_doses(medications, start, now) for days, start in window_starts.items()
+    }
 
-    return Response(upcoming_medications)
\ No newline at end of file
+    overall = {days: [0, 0, 0, 0] for days in ADHERENCE_WINDOWS}
+    per_medication = []
+    for i, med in enumerate(medications):
+        row = events.get(med.id, {})
+        entry = {'medication_id': med.id, 'medication_name': med.medication_name}
+        for days in ADHERENCE_WINDOWS:
+            counts = [
+                scheduled_counts[days][i],
+                row.get(f'taken_{days}', 0),
+                row.get(f'late_{days}', 0),
+                row.get(f'skipped_{days}', 0),
+            ]
+            entry[f'{days}d'] = adherence_summary(*counts)
+            overall[days] = [total + count for total, count in zip(overall[days], counts)]
+        per_medication.append(entry)
+
+    return Response({
+        'overall': {f'{days}d': adherence_summary(*overall[days]) for days in ADHERENCE_WINDOWS},
+        'medications': per_medication,
+    })
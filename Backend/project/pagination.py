@@ -0,0 +1,23 @@
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+
+class OptInCursorPagination(CursorPagination):
+    """Cursor pagination that only applies when the client asks for it.
+
+    History endpoints used to return a plain list. Requests that send
+    page_size or cursor get a paginated page; others keep getting the full
+    list, so existing clients keep working.
+    """
+    page_size_query_param = 'page_size'
+
+    def requested(self, request):
+        params = request.query_params
+        return self.page_size_query_param in params or self.cursor_query_param in params
+
+    def list_response(self, request, queryset, serialize):
+        """Response for `queryset`; `serialize` turns rows (a page or the queryset) into data."""
+        if self.requested(request):
+            page = self.paginate_queryset(queryset, request)
+            return self.get_paginated_response(serialize(page))
+        return Response(serialize(queryset))
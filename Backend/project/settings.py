@@ -41,6 +41,23 @@ DRUG_INTERACTION_MODEL_PATH = os.path.join(MODEL_DIR, 'DDI_rf_model.pkl')
 DRUG_INDEX_PATH = os.path.join(MODEL_DIR, 'drug_index.npy')
 U_MATRIX_PATH = os.path.join(MODEL_DIR, 'u_matrix.npy')
 VT_MATRIX_PATH = os.path.join(MODEL_DIR, 'vt_matrix.npy')
+# uint8 severity table written by `manage.py precompute_interactions` (optional)
+DRUG_INTERACTION_TABLE_PATH = os.path.join(MODEL_DIR, 'interaction_table.npy')
+# Optional JSON {brand/alias: generic name} used by the drug-name resolver
+DRUG_SYNONYMS_PATH = os.path.join(MODEL_DIR, 'drug_synonyms.json')
+# Push transport for medication reminders (firebase_admin, credentials from GOOGLE_APPLICATION_CREDENTIALS);
+# tests switch to 'medication.reminders.LocalTransport' with override_settings
+MEDICATION_REMINDER_TRANSPORT = config('MEDICATION_REMINDER_TRANSPORT', default='medication.reminders.FCMTransport')
+
+# Glucose forecasting model (GRU) and its scaler
+GLUCOSE_MODEL_PATH = os.path.join(BASE_DIR, 'diabetis', 'resourses', 'gru_model.keras')
+GLUCOSE_SCALER_PATH = os.path.join(BASE_DIR, 'diabetis', 'resourses', 'scaler.pkl')
+# Load the glucose model when the server starts instead of on the first measurement
+GLUCOSE_MODEL_WARMUP = config('GLUCOSE_MODEL_WARMUP', default=False, cast=bool)
+# Glucose forecasts run in a background thread pool after the measurement is saved
+GLUCOSE_PREDICTION_ASYNC = True
+GLUCOSE_PREDICTION_WORKERS = 2
+
 # Application definition
 
 INSTALLED_APPS = [
@@ -210,6 +227,14 @@ EMAIL_PORT = config('EMAIL_PORT')
 EMAIL_HOST_USER = config('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD')
 EMAIL_USE_TLS = config('EMAIL_USE_TLS')
+# OTP and other emails go through a background queue (accounts.email_queue);
+# set EMAIL_QUEUE_ASYNC=False to send inline, e.g. with the locmem/console backend in tests
+EMAIL_QUEUE_ASYNC = config('EMAIL_QUEUE_ASYNC', default=True, cast=bool)
+EMAIL_QUEUE_BATCH_SIZE = 50
+EMAIL_QUEUE_MAX_RETRIES = 3
+# Email verification and password reset codes
+OTP_EXPIRY_MINUTES = 10
+OTP_MAX_ATTEMPTS = 5
 GOOGLE_CLIENT_ID = config('GOOGLE_WEB_CLIENT_ID')
 GOOGLE_CLIENT_SECRET = config('GOOGLE_CLIENT_SECRET')
 SOCIAL_AUTH_PASSWORD = config('SOCIAL_AUTH_PASSWORD')